@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from app.schemas.reindex import ReindexStatus
+from app.services.elasticsearch import get_es_service
+from app.services.reindex import get_reindex_job
+
+router = APIRouter(prefix="/admin", tags=["관리"])
+
+
+@router.post(
+    "/reindex",
+    response_model=ReindexStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="재임베딩·재색인 시작",
+    description=(
+        "현재 임베딩 설정으로 전체 도서를 새 버전 인덱스에 다시 색인한 뒤 alias를 전환합니다. "
+        "백그라운드에서 실행되며, 내용과 임베딩 버전이 같은 문서는 저장된 벡터를 재사용합니다. "
+        "중단된 작업이 있으면 체크포인트부터 이어서 진행합니다."
+    ),
+)
+async def start_reindex(
+    delete_old: bool = Query(default=False, description="전환 후 이전 인덱스 삭제"),
+    restart: bool = Query(default=False, description="체크포인트를 버리고 처음부터 다시 시작"),
+):
+    es = get_es_service()
+    
+    if not es.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Elasticsearch가 연결되어 있지 않습니다.",
+        )
+    
+    job = get_reindex_job()
+    if not job.start(delete_old=delete_old, restart=restart):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="재색인 작업이 이미 진행 중입니다.",
+        )
+    return job.progress()
+
+
+@router.get(
+    "/reindex",
+    response_model=ReindexStatus,
+    summary="재색인 진행 상황",
+    description="재임베딩·재색인 작업의 상태와 처리한 문서 수를 조회합니다.",
+)
+async def get_reindex_status():
+    return get_reindex_job().progress()
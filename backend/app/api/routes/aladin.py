@@ -1,5 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query, status
-from app.schemas.aladin import AladinBookItem, AladinSearchResponse
+from app.schemas.aladin import (
+    AladinBatchLookupItem,
+    AladinBatchLookupRequest,
+    AladinBookItem,
+    AladinSearchResponse,
+)
 from app.services.aladin import get_aladin_service
 
 router = APIRouter(prefix="/aladin", tags=["알라딘 도서 검색"])
@@ -39,6 +44,27 @@ async def search_books(
         )
 
 
+@router.post(
+    "/lookup/batch",
+    response_model=list[AladinBatchLookupItem],
+    summary="ISBN 일괄 조회",
+    description=(
+        "여러 ISBN의 도서 정보를 한 번에 조회합니다. "
+        "동시 실행 수와 호출 속도를 제한하여 병렬로 조회하며, 결과는 입력 순서대로 항목별 오류와 함께 반환합니다."
+    ),
+)
+async def lookup_books_batch(request: AladinBatchLookupRequest):
+    aladin = get_aladin_service()
+    
+    if not aladin._is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="알라딘 API 키가 설정되지 않았습니다.",
+        )
+    
+    return await aladin.lookup_many(request.isbns)
+
+
 @router.get(
     "/lookup/{isbn}",
     response_model=AladinBookItem,
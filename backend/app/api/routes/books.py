@@ -1,9 +1,55 @@
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.book import BookCreateRequest, BookResponse
+import json
+from collections.abc import AsyncIterator
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from app.schemas.book import BookCreateRequest, BookResponse, BulkIndexResponse
 from app.services.elasticsearch import get_es_service
 
 router = APIRouter(prefix="/books", tags=["도서 관리"])
 
+RefreshPolicy = Literal["immediate", "wait_for", "none"]
+REFRESH_QUERY = Query(
+    default=None,
+    description="쓰기 후 refresh 정책 (미지정 시 서버 기본값 ES_REFRESH_POLICY)",
+)
+
+
+def _parse_item(raw) -> BookCreateRequest | str:
+    """일괄 등록 항목 하나를 검증합니다. 실패 시 오류 메시지를 돌려줍니다."""
+    try:
+        return BookCreateRequest.model_validate(raw)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+
+
+def _parse_line(line: bytes) -> BookCreateRequest | str:
+    try:
+        return _parse_item(json.loads(line))
+    except json.JSONDecodeError as e:
+        return f"잘못된 JSON: {e}"
+
+
+async def _iter_json_array(items: list) -> AsyncIterator[BookCreateRequest | str]:
+    for raw in items:
+        yield _parse_item(raw)
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[BookCreateRequest | str]:
+    """요청 본문을 스트리밍으로 읽으며 NDJSON 한 줄씩 파싱합니다."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
 
 @router.post(
     "",
@@ -12,28 +58,128 @@ router = APIRouter(prefix="/books", tags=["도서 관리"])
     summary="도서 등록",
     description="도서 정보와 감상평을 등록합니다. 감상평은 임베딩되어 벡터 검색에 사용됩니다.",
 )
-async def create_book(request: BookCreateRequest):
+async def create_book(
+    request: BookCreateRequest,
+    refresh: RefreshPolicy | None = REFRESH_QUERY,
+):
     es = get_es_service()
     
-    if not await es.ping():
+    if not es.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Elasticsearch가 연결되어 있지 않습니다.",
         )
     
-    book = await es.index_book(request)
+    book = await es.index_book(request, refresh=refresh)
     return book
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkIndexResponse,
+    summary="도서 일괄 등록",
+    description=(
+        "여러 도서를 한 번에 등록합니다. JSON 배열 또는 NDJSON(application/x-ndjson) "
+        "스트림을 받으며, 청크 단위로 배치 임베딩 후 bulk 색인하고 항목별 결과를 반환합니다."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/BookCreateRequest"},
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/BookCreateRequest"}
+                },
+            },
+        }
+    },
+)
+async def create_books_bulk(
+    request: Request,
+    refresh: RefreshPolicy | None = REFRESH_QUERY,
+):
+    es = get_es_service()
+    
+    if not es.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Elasticsearch가 연결되어 있지 않습니다.",
+        )
+    
+    if "ndjson" in request.headers.get("content-type", ""):
+        return await es.index_books_bulk(_iter_ndjson(request), refresh=refresh)
+    
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        body = None
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="요청 본문은 도서 객체의 JSON 배열이어야 합니다.",
+        )
+    
+    return await es.index_books_bulk(_iter_json_array(body), refresh=refresh)
+
+
 @router.get(
     "",
     response_model=list[BookResponse],
     summary="도서 목록 조회",
-    description="등록된 모든 도서를 최신순으로 조회합니다.",
+    description=(
+        "등록된 도서를 최신순으로 조회합니다. 다음 페이지가 있으면 X-Next-Cursor 헤더로 "
+        "커서를 반환하며, cursor 파라미터로 전달하면 이어서 조회합니다."
+    ),
+)
+async def get_books(
+    response: Response,
+    size: int = Query(default=100, ge=1, le=1000, description="페이지 크기"),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor 값"),
+):
+    es = get_es_service()
+    
+    try:
+        books, next_cursor = await es.get_all_books(size=size, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return books
+
+
+@router.get(
+    "/export",
+    summary="도서 내보내기",
+    description=(
+        "등록된 모든 도서를 NDJSON 스트림으로 내보냅니다. "
+        "출력은 POST /api/books/bulk 에 그대로 다시 등록할 수 있습니다."
+    ),
+    response_class=StreamingResponse,
 )
-async def get_books():
+async def export_books():
     es = get_es_service()
-    return await es.get_all_books()
+    
+    if not es.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Elasticsearch가 연결되어 있지 않습니다.",
+        )
+    
+    async def lines():
+        async for book in es.iter_books():
+            yield book.model_dump_json() + "\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="books.ndjson"'},
+    )
 
 
 @router.get(
@@ -61,9 +207,12 @@ async def get_book(book_id: str):
     summary="도서 삭제",
     description="등록된 도서를 삭제합니다.",
 )
-async def delete_book(book_id: str):
+async def delete_book(
+    book_id: str,
+    refresh: RefreshPolicy | None = REFRESH_QUERY,
+):
     es = get_es_service()
-    deleted = await es.delete_book(book_id)
+    deleted = await es.delete_book(book_id, refresh=refresh)
     
     if not deleted:
         raise HTTPException(
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException, status
-from app.schemas.book import RecommendationResponse
-from app.schemas.recommendation import RecommendByReviewRequest, RecommendByBookRequest
+from app.schemas.book import RecommendationGroupResponse, RecommendationResponse
+from app.schemas.recommendation import (
+    RecommendBatchRequest,
+    RecommendByReviewRequest,
+    RecommendByBookRequest,
+)
 from app.services.elasticsearch import get_es_service
 
 router = APIRouter(prefix="/recommendations", tags=["도서 추천"])
@@ -15,7 +19,7 @@ router = APIRouter(prefix="/recommendations", tags=["도서 추천"])
 async def recommend_by_review(request: RecommendByReviewRequest):
     es = get_es_service()
     
-    if not await es.ping():
+    if not es.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Elasticsearch가 연결되어 있지 않습니다.",
@@ -24,6 +28,7 @@ async def recommend_by_review(request: RecommendByReviewRequest):
     results = await es.search_similar_by_review(
         review=request.review,
         top_k=request.top_k,
+        filters=request.filters,
     )
     
     if not results:
@@ -44,7 +49,7 @@ async def recommend_by_review(request: RecommendByReviewRequest):
 async def recommend_by_book(request: RecommendByBookRequest):
     es = get_es_service()
     
-    if not await es.ping():
+    if not es.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Elasticsearch가 연결되어 있지 않습니다.",
@@ -53,6 +58,7 @@ async def recommend_by_book(request: RecommendByBookRequest):
     results = await es.search_similar_by_book_id(
         book_id=request.book_id,
         top_k=request.top_k,
+        filters=request.filters,
     )
     
     if results is None:
@@ -67,4 +73,34 @@ async def recommend_by_book(request: RecommendByBookRequest):
             detail="추천할 유사 도서가 없습니다. 도서를 더 등록해 주세요.",
         )
     
-    return results
\ No newline at end of file
+    return results
+
+
+@router.post(
+    "/batch",
+    response_model=list[RecommendationGroupResponse],
+    summary="감상평 일괄 추천",
+    description=(
+        "여러 감상평(취향)에 대한 추천을 한 번에 받습니다. "
+        "모든 감상평을 한 번에 배치 임베딩하고 kNN 검색도 한 번의 요청(_msearch)으로 처리합니다."
+    ),
+)
+async def recommend_batch(request: RecommendBatchRequest):
+    es = get_es_service()
+    
+    if not es.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Elasticsearch가 연결되어 있지 않습니다.",
+        )
+    
+    groups = await es.search_similar_by_reviews(
+        reviews=request.reviews,
+        top_k=request.top_k,
+        filters=request.filters,
+    )
+    
+    return [
+        RecommendationGroupResponse(review=review, recommendations=recommendations)
+        for review, recommendations in zip(request.reviews, groups)
+    ]
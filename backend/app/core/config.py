@@ -10,14 +10,102 @@ class Settings(BaseSettings):
     # Elasticsearch
     es_host: str = "http://localhost:9200"
     es_index: str = "books"
+    es_health_interval: float = 5.0         # 백그라운드 헬스 체크 간격 (초)
+    es_health_timeout: float = 2.0          # 헬스 체크 ping 타임아웃 (초)
+    es_breaker_failure_threshold: int = 3   # 회로 차단기가 열리는 연속 실패 수
+    es_breaker_reset_timeout: float = 10.0  # 차단 후 재시도까지 대기 (초)
+    es_refresh_policy: str = "wait_for"     # 쓰기 후 refresh 정책: immediate / wait_for / none
+    es_refresh_interval: str = "1s"         # 인덱스 생성 시 주기적 refresh 간격
+    es_store_vectors_in_source: bool = True # False면 임베딩 벡터를 저장된 _source에서 제외
+    
+    # Elasticsearch kNN (HNSW)
+    es_index_type: str = "hnsw"         # 벡터 인덱스: "hnsw" / "int8_hnsw" / "int4_hnsw"
+    es_hnsw_m: int = 16                 # 노드당 연결 수
+    es_hnsw_ef_construction: int = 100  # 색인 시 탐색 후보 수
+    es_knn_num_candidates: int = 0      # 검색 시 샤드별 후보 수 (0이면 max(top_k*10, 100))
+    
+    # Elasticsearch 2단계 검색 (MRL: 저차원 벡터로 후보 생성 → 전체 벡터로 재점수)
+    es_two_stage: bool = False
+    es_coarse_dimension: int = 256          # 후보 생성용 벡터 차원 (embedding_dimension보다 작게)
+    es_coarse_index_type: str = "int8_hnsw" # 후보 생성용 벡터 인덱스
+    es_index_full_vector: bool = False      # 2단계 검색 시 전체 벡터도 HNSW로 색인할지 여부
+    es_rescore_window: int = 100            # 샤드별로 전체 벡터로 재점수할 후보 수
+    
+    # Similar Books Cache (도서 기반 추천 이웃 목록)
+    similar_cache_enabled: bool = True
+    similar_cache_k: int = 20               # 도서별로 보관할 이웃 수 (top_k 최댓값 이상)
+    similar_cache_fanout: int = 100         # 새 도서 추가 시 이웃 목록 갱신을 확인할 후보 수
+    similar_cache_size: int = 10000         # 캐시할 최대 도서 수
+    similar_cache_ttl: float = 300.0        # 목록 유효 시간 (초, 다른 워커의 쓰기 반영용)
+    
+    # Vector Search Backend
+    vector_backend: str = "elasticsearch"       # kNN 검색: "elasticsearch" 또는 "local"
+    local_vector_path: str = ".cache/vectors"   # 로컬 벡터 저장소 (SQLite, 워커 간 공유) 경로
+    local_vector_dtype: str = "float32"         # "float32" 또는 "float16"
+    bulk_embedding_chunk_size: int = 32     # 일괄 등록 시 한 번에 임베딩할 도서 수
+    es_pit_keep_alive: str = "2m"           # 내보내기·재색인 point-in-time 유지 시간
+    es_export_batch_size: int = 500         # 내보내기 시 한 번에 읽을 문서 수
+
+    # Reindex (재임베딩 후 새 버전 인덱스로 alias 전환, 중단 시 체크포인트부터 재개)
+    reindex_batch_size: int = 256           # 한 번에 읽고 임베딩할 문서 수
+    reindex_checkpoint_path: str = ".cache/reindex.json"  # 진행 상황 체크포인트 파일
 
     # Embedding Model
     embedding_model_name: str = "Qwen/Qwen3-Embedding-0.6B"
     embedding_dimension: int = 1024     # MRL 지원: 256, 512, 1024 중 선택
     embedding_device: str = "cpu"       # "cpu" 또는 "cuda"
+    embedding_backend: str = "torch"    # 추론 백엔드: "torch" / "torch_int8" / "bf16" / "onnx"
+    embedding_onnx_path: str = ".cache/onnx/model.onnx"  # onnx 백엔드용 내보내기 경로
+    embedding_executor: str = "thread"  # 추론 실행기: "thread" 또는 "process"
+    embedding_max_workers: int = 1      # 추론 실행기 워커 수
+    embedding_max_length: int = 8192    # 최대 시퀀스 길이 (토큰)
+    embedding_truncation: str = "head_tail"  # 초과분 처리: "head" / "tail" / "head_tail"
+    embedding_long_text: str = "truncate"    # 긴 텍스트 처리: "truncate"(한 번에 추론) / "chunk"(청크 분할)
+    embedding_chunk_threshold: int = 1024    # 이 토큰 수를 넘는 텍스트만 청크로 분할
+    embedding_chunk_size: int = 512          # 청크당 최대 토큰 수 (forward pass 하나의 길이 상한)
+    embedding_chunk_overlap: int = 64        # 인접 청크가 겹치는 토큰 수
+    embedding_chunk_pooling: str = "weighted"  # 청크 벡터 결합: "mean" / "weighted"(토큰 수 가중) / "max"
+    embedding_lazy_load: bool = True    # 모델을 백그라운드에서 로드 (로드 완료 전에도 서버 기동)
+    embedding_warmup: bool = True       # 로드 직후 워밍업 추론 1회 실행
+    embedding_local_files_only: bool = False  # 허브 확인 없이 로컬 캐시에서만 로드
+    embedding_model_cache_dir: str = ""       # 모델 캐시 디렉토리 (비우면 HF_HOME 기본값)
+    embedding_worker_socket: str = ""         # 공유 임베딩 워커 Unix 소켓 (비우면 프로세스 내 추론)
+    embedding_worker_timeout: float = 30.0    # 워커 요청 타임아웃 (초, 배치는 EMBEDDING_BATCH_MAX_SIZE개 단위마다)
+    
+    # Embedding Micro-batching (동시 요청을 모아 한 번의 forward pass로 처리)
+    embedding_batching_enabled: bool = True
+    embedding_batch_max_size: int = 32          # 배치당 최대 요청 수
+    embedding_batch_max_wait_ms: float = 5.0    # 배치를 모으는 최대 대기 시간
+    embedding_batch_max_tokens: int = 32768     # forward pass당 최대 토큰 수 (패딩 포함, 실행기에서 길이별로 분할)
+    
+    # Embedding Cache (instruction + 텍스트 + 모델 + 차원 기준 LRU 캐시)
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 4096    # 메모리에 유지할 최대 벡터 수
+    embedding_cache_path: str = ""      # SQLite 파일 경로 (비우면 메모리 전용)
 
     # Aladin API
     aladin_api_key: str = ""
+    aladin_max_connections: int = 20               # 커넥션 풀 최대 연결 수
+    aladin_max_keepalive_connections: int = 10     # 유지할 keep-alive 연결 수
+    aladin_keepalive_expiry: float = 30.0          # keep-alive 유휴 만료 (초)
+    aladin_timeout: float = 10.0                   # 기본 타임아웃 (초)
+    aladin_search_timeout: float = 10.0            # 도서 검색 타임아웃 (초)
+    aladin_lookup_timeout: float = 5.0             # ISBN 조회 타임아웃 (초)
+    aladin_list_timeout: float = 10.0              # 베스트셀러 목록 타임아웃 (초)
+    aladin_batch_concurrency: int = 8              # ISBN 일괄 조회 동시 실행 수
+    aladin_rate_limit_per_second: float = 10.0     # 업스트림 호출 속도 제한 (0이면 제한 없음)
+    aladin_rate_limit_burst: int = 10              # 순간 허용 호출 수
+    
+    # Aladin Cache (TTL + stale-while-revalidate + 동시 요청 합치기)
+    aladin_cache_enabled: bool = True
+    aladin_cache_size: int = 1024                  # 최대 캐시 항목 수
+    aladin_search_ttl: float = 300.0               # 도서 검색 TTL (초)
+    aladin_lookup_ttl: float = 86400.0             # ISBN 조회 TTL (초)
+    aladin_bestseller_ttl: float = 3600.0          # 베스트셀러 TTL (초)
+    aladin_cache_stale_ttl: float = 3600.0         # TTL 이후 이전 값을 제공하며 갱신하는 구간 (초)
+    
+    # Metrics (Prometheus 텍스트 포맷 /metrics)
+    metrics_enabled: bool = True                   # False면 HTTP·ES·알라딘 계측을 건너뛰고 /metrics는 404
 
     model_config = {
         "env_file": ".env",
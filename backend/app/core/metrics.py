@@ -0,0 +1,203 @@
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# 요청 지연(초) 기본 버킷
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 배치 크기 / 토큰 수처럼 개수를 재는 히스토그램용 버킷
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# PROMETHEUS_MULTIPROC_DIR가 설정되어 있으면 prometheus_client가 프로세스별 값을 파일에 기록하고
+# /metrics에서 모든 uvicorn 워커·추론 워커 프로세스의 값을 합산합니다.
+# (환경 변수는 prometheus_client import 전에 설정되어 있어야 합니다)
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+# ── HTTP ──
+HTTP_REQUESTS = Counter(
+    "librarian_http_requests_total", "HTTP 요청 수", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "librarian_http_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ("method", "route"),
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "librarian_http_requests_in_flight", "처리 중인 HTTP 요청 수", multiprocess_mode="livesum"
+)
+
+# ── 임베딩 ──
+EMBEDDING_STAGE_DURATION = Histogram(
+    "librarian_embedding_stage_duration_seconds",
+    "임베딩 단계별 처리 시간 (tokenize / forward / pooling)",
+    ("stage",),
+    buckets=DEFAULT_BUCKETS,
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "librarian_embedding_batch_size", "forward pass당 텍스트 수", buckets=SIZE_BUCKETS
+)
+EMBEDDING_BATCH_TOKENS = Histogram(
+    "librarian_embedding_batch_tokens",
+    "forward pass당 토큰 수 (패딩 포함)",
+    buckets=TOKEN_BUCKETS,
+)
+EMBEDDING_TEXT_TOKENS = Histogram(
+    "librarian_embedding_text_tokens", "텍스트별 토큰 수", buckets=TOKEN_BUCKETS
+)
+EMBEDDING_IN_FLIGHT = Gauge(
+    "librarian_embedding_in_flight",
+    "추론 대기·진행 중인 임베딩 요청 수",
+    multiprocess_mode="livesum",
+)
+
+# ── Elasticsearch ──
+ES_REQUEST_DURATION = Histogram(
+    "librarian_es_request_duration_seconds",
+    "Elasticsearch 호출 시간",
+    ("operation",),
+    buckets=DEFAULT_BUCKETS,
+)
+ES_REQUEST_ERRORS = Counter(
+    "librarian_es_request_errors_total", "Elasticsearch 호출 실패 수", ("operation",)
+)
+
+# ── 알라딘 ──
+ALADIN_REQUEST_DURATION = Histogram(
+    "librarian_aladin_request_duration_seconds",
+    "알라딘 API 호출 시간",
+    ("endpoint",),
+    buckets=DEFAULT_BUCKETS,
+)
+ALADIN_REQUEST_ERRORS = Counter(
+    "librarian_aladin_request_errors_total", "알라딘 API 호출 실패 수", ("endpoint",)
+)
+
+
+@contextmanager
+def observe_call(
+    duration: Histogram,
+    errors: Counter,
+    ignore: tuple[type[BaseException], ...] = (),
+    **labels: str,
+) -> Iterator[None]:
+    """외부 호출 시간을 기록하고, ignore에 없는 예외가 나면 실패 수를 올립니다."""
+    if not settings.metrics_enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except ignore:
+        raise
+    except BaseException:
+        errors.labels(**labels).inc()
+        raise
+    finally:
+        duration.labels(**labels).observe(time.perf_counter() - started)
+
+
+class _CacheCollector:
+    """
+    캐시의 stats()를 수집 시점에 읽어 적중/미스 카운터와 크기 게이지로 노출합니다.
+    캐시는 프로세스마다 따로 있으므로 멀티프로세스 모드에서도 응답한 워커의 값입니다.
+    """
+    
+    def __init__(self):
+        self.caches: dict[str, Callable[[], dict]] = {}
+    
+    def collect(self):
+        for name, stats in self.caches.items():
+            current = stats()
+            requests = CounterMetricFamily(
+                f"librarian_{name}_cache_requests",
+                f"{name} 캐시 조회 수 (result별)",
+                labels=("result",),
+            )
+            for result in ("hits", "stale_hits", "misses", "coalesced"):
+                if result in current:
+                    requests.add_metric((result,), current[result])
+            yield requests
+            yield GaugeMetricFamily(
+                f"librarian_{name}_cache_size", f"{name} 캐시 항목 수", value=current["size"]
+            )
+
+
+_CACHES = _CacheCollector()
+REGISTRY.register(_CACHES)
+
+
+def register_cache_metrics(name: str, stats: Callable[[], dict]) -> None:
+    """캐시 통계를 /metrics에 연결합니다. (같은 이름이면 교체 — 서비스 재생성 시 갱신)"""
+    _CACHES.caches[name] = stats
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Prometheus 텍스트 포맷 본문과 Content-Type (멀티프로세스 모드면 모든 프로세스를 합산)"""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_CACHES)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """종료하는 프로세스의 livesum 게이지 값을 합산에서 제외합니다. (멀티프로세스 모드)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 수·처리 시간·동시 처리 수를 기록하는 ASGI 미들웨어
+    - 처리 시간은 응답 직렬화와 스트리밍 본문 전송까지 포함합니다.
+    - route 레이블은 경로 템플릿(/api/books/{book_id})이라 값 개수가 늘어나지 않습니다.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.metrics_enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(method=scope["method"], route=route).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(
+                method=scope["method"], route=route, status=str(status_code)
+            ).inc()
@@ -0,0 +1,13 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def phase_timer(timings: dict[str, float], name: str) -> Iterator[None]:
+    """블록 실행 시간을 timings[name]에 초 단위로 기록합니다. (기동 단계별 소요 시간 측정용)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - started, 3)
@@ -1,41 +1,88 @@
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from elasticsearch import ConnectionError as ESConnectionError
+from elasticsearch import ConnectionTimeout as ESConnectionTimeout
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
+from app.core.metrics import (
+    MetricsMiddleware,
+    mark_process_dead,
+    register_cache_metrics,
+    render_metrics,
+)
+from app.core.timing import phase_timer
 from app.services.embedding import get_embedding_service
 from app.services.elasticsearch import get_es_service
+from app.services.aladin import get_aladin_service
+from app.services.reindex import get_reindex_job
 from app.api.routes.books import router as books_router
 from app.api.routes.recommendations import router as recommendations_router
 from app.api.routes.aladin import router as aladin_router
+from app.api.routes.admin import router as admin_router
 
 settings = get_settings()
 
+# 기동 단계별 소요 시간(초) — 임베딩 모델 로드 단계는 embedding_service.load_timings에 기록됩니다
+startup_timings: dict[str, float] = {}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting AI Librarian...")
-    get_embedding_service()
+    started = time.perf_counter()
+    
+    # 모델 로드는 백그라운드에서 진행하고, 준비 여부는 /health/ready로 확인합니다
+    embedding_service = get_embedding_service()
+    with phase_timer(startup_timings, "embedding"):
+        if settings.embedding_lazy_load:
+            embedding_service.start_loading()
+        else:
+            await embedding_service.wait_until_ready()
     
     es = get_es_service()
-    if await es.ping():
-        print("✅ Elasticsearch connected")
-        await es.create_index_if_not_exists()
-    else:
-        print("⚠️ Elasticsearch not available — start ES before indexing books")
+    with phase_timer(startup_timings, "elasticsearch"):
+        if await es.check_health():
+            print("✅ Elasticsearch connected")
+        else:
+            print("⚠️ Elasticsearch not available — start ES before indexing books")
+    es.start_health_monitor()
+    
+    if settings.metrics_enabled:
+        _register_cache_metrics()
     
     if settings.aladin_api_key:
+        get_aladin_service().start()
         print("✅ Aladin API key configured")
     else:
         print("⚠️ Aladin API key not set — book search disabled")
     
-    print("🚀 AI Librarian is ready!")
+    startup_timings["total"] = round(time.perf_counter() - started, 3)
+    print(f"🚀 AI Librarian is up in {startup_timings['total']:.2f}s {startup_timings}")
     yield
     
     # Shutdown
     print("👋 Shutting down AI Librarian...")
+    get_reindex_job().cancel()  # 체크포인트가 남아 다음 실행에서 이어집니다
     es = get_es_service()
     await es.close()
+    await get_aladin_service().close()
+    get_embedding_service().shutdown()
+    mark_process_dead()
+
+
+def _register_cache_metrics() -> None:
+    """각 캐시의 적중/미스 통계를 /metrics에 연결합니다. (수집 시점에 stats()를 읽음)"""
+    caches = {
+        "embedding": get_embedding_service().cache,
+        "similar_books": get_es_service().similar_cache,
+        "aladin": get_aladin_service().cache,
+    }
+    for name, cache in caches.items():
+        if cache is not None:
+            register_cache_metrics(name, cache.stats)
 
 
 app = FastAPI(
@@ -51,12 +98,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # ── 라우터 등록 ──
 app.include_router(books_router, prefix="/api")
 app.include_router(recommendations_router, prefix="/api")
 app.include_router(aladin_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+
+
+@app.exception_handler(ESConnectionError)
+@app.exception_handler(ESConnectionTimeout)
+async def es_unavailable_handler(request: Request, exc: Exception):
+    # 요청 처리 중 연결 오류는 회로 차단기에 기록하고 503으로 응답합니다
+    get_es_service().record_failure()
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Elasticsearch가 연결되어 있지 않습니다."},
+    )
 
 
 @app.get("/")
@@ -64,17 +125,61 @@ async def root():
     return {"message": "📚 AI Librarian API is running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 텍스트 포맷 메트릭"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/health/live")
+async def liveness():
+    """프로세스가 요청을 처리할 수 있는지 (모델·ES 상태와 무관)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """임베딩 모델 로드와 워밍업이 끝나 추천 요청을 바로 처리할 수 있는지"""
+    embedding_service = get_embedding_service()
+    content = {
+        "status": "ready" if embedding_service.ready else "not ready",
+        "embedding": embedding_service.status,
+        "elasticsearch": "connected" if get_es_service().healthy else "disconnected",
+        "startup_timings": startup_timings,
+        "embedding_load_timings": embedding_service.load_timings,
+    }
+    if embedding_service.load_error:
+        content["embedding_error"] = embedding_service.load_error
+    if not embedding_service.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+    return content
+
+
 @app.get("/health")
 async def health_check():
     es = get_es_service()
-    es_connected = await es.ping()
+    embedding_service = get_embedding_service()
+    aladin = get_aladin_service()
     
     return {
         "status": "healthy",
-        "elasticsearch": "connected" if es_connected else "disconnected",
+        "elasticsearch": "connected" if es.healthy else "disconnected",
+        "es_circuit_breaker": es.breaker.state,
+        "similar_cache": es.similar_cache.stats() if es.similar_cache else None,
         "es_host": settings.es_host,
         "embedding_model": settings.embedding_model_name,
         "embedding_dimension": settings.embedding_dimension,
+        "vector_backend": settings.vector_backend,
         "device": settings.embedding_device,
+        "embedding_backend": settings.embedding_backend,
+        "embedding_status": embedding_service.status,
+        "embedding_worker": settings.embedding_worker_socket or None,
+        "startup_timings": startup_timings,
+        "embedding_load_timings": embedding_service.load_timings,
+        "embedding_cache": embedding_service.cache.stats() if embedding_service.cache else None,
         "aladin_api": "configured" if settings.aladin_api_key else "not configured",
+        "aladin_cache": aladin.cache.stats() if aladin.cache else None,
     }
\ No newline at end of file
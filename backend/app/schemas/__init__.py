@@ -2,18 +2,40 @@ from .book import (
     BookCreateRequest,
     BookDocument,
     BookResponse,
+    BulkIndexResponse,
+    BulkItemResult,
+    RecommendationGroupResponse,
     RecommendationResponse,
 )
-from .recommendation import RecommendByReviewRequest, RecommendByBookRequest
-from .aladin import AladinBookItem, AladinSearchResponse
+from .recommendation import (
+    RecommendationFilter,
+    RecommendBatchRequest,
+    RecommendByReviewRequest,
+    RecommendByBookRequest,
+)
+from .aladin import (
+    AladinBatchLookupItem,
+    AladinBatchLookupRequest,
+    AladinBookItem,
+    AladinSearchResponse,
+)
+from .reindex import ReindexStatus
 
 __all__ = [
     "BookCreateRequest",
     "BookDocument",
     "BookResponse",
+    "BulkIndexResponse",
+    "BulkItemResult",
+    "RecommendationGroupResponse",
     "RecommendationResponse",
+    "RecommendationFilter",
+    "RecommendBatchRequest",
     "RecommendByReviewRequest",
     "RecommendByBookRequest",
+    "AladinBatchLookupItem",
+    "AladinBatchLookupRequest",
     "AladinBookItem",
     "AladinSearchResponse",
+    "ReindexStatus",
 ]
\ No newline at end of file
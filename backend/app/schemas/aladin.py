@@ -28,4 +28,16 @@ class AladinSearchResponse(BaseModel):
     items_per_page: int = Field(default=0, alias="itemsPerPage")
     items: list[AladinBookItem] = Field(default=[], alias="item", serialization_alias="items")
     
-    model_config = {"populate_by_name": True}
\ No newline at end of file
+    model_config = {"populate_by_name": True}
+
+
+class AladinBatchLookupRequest(BaseModel):
+    """ISBN 일괄 조회 요청"""
+    isbns: list[str] = Field(..., min_length=1, max_length=200, description="ISBN10 또는 ISBN13 목록")
+
+
+class AladinBatchLookupItem(BaseModel):
+    """ISBN 일괄 조회의 개별 결과 (입력 순서 유지)"""
+    isbn: str
+    book: AladinBookItem | None = None
+    error: str | None = None
@@ -26,6 +26,9 @@ class BookDocument(BaseModel):
     rating: float = 0.0
     tags: list[str] = []
     embedding: list[float] = []
+    embedding_coarse: list[float] | None = None  # 2단계 검색용 저차원(MRL) 벡터
+    content_hash: str | None = None       # 제목+저자+감상평 텍스트의 SHA-256
+    embedding_version: str | None = None  # 벡터를 만든 모델·차원·긴 텍스트 설정
     created_at: datetime
 
 
@@ -41,7 +44,28 @@ class BookResponse(BaseModel):
     created_at: datetime
 
 
+# ── 일괄 등록 결과 ──
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="입력 순서 (0부터)")
+    id: str | None = Field(None, description="저장된 도서 ID (실패 시 없음)")
+    success: bool
+    error: str | None = None
+
+
+class BulkIndexResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    items: list[BulkItemResult]
+
+
 # ── 추천 결과 응답 ──
 class RecommendationResponse(BaseModel):
     book: BookResponse
-    score: float = Field(..., description="코사인 유사도 점수 (0~1)")
\ No newline at end of file
+    score: float = Field(..., description="코사인 유사도 점수 (0~1)")
+
+
+# ── 일괄 추천 결과 (감상평별 묶음) ──
+class RecommendationGroupResponse(BaseModel):
+    review: str
+    recommendations: list[RecommendationResponse]
@@ -1,6 +1,19 @@
+from datetime import datetime
+from typing import Annotated
 from pydantic import BaseModel, Field
 
 
+# ── 추천 결과 필터 (kNN 검색 중 사전 필터링) ──
+class RecommendationFilter(BaseModel):
+    tags: list[str] = Field(default=[], description="이 중 하나 이상의 태그를 가진 도서만")
+    min_rating: float | None = Field(None, ge=0.0, le=5.0, description="최소 별점")
+    created_from: datetime | None = Field(None, description="등록일 시작 (포함)")
+    created_to: datetime | None = Field(None, description="등록일 끝 (포함)")
+    
+    def is_empty(self) -> bool:
+        return not (self.tags or self.min_rating is not None or self.created_from or self.created_to)
+
+
 # ── 감상평 기반 추천 요청 ──
 class RecommendByReviewRequest(BaseModel):
     review: str = Field(
@@ -9,9 +22,26 @@ class RecommendByReviewRequest(BaseModel):
         example="우주의 광활함 속에서 인간 존재의 의미를 생각하게 만드는 SF 소설이 읽고 싶다.",
     )
     top_k: int = Field(default=5, ge=1, le=20, description="추천받을 도서 수")
+    filters: RecommendationFilter | None = Field(None, description="추천 대상 필터")
 
 
 # ── 등록된 도서 기반 추천 요청 ──
 class RecommendByBookRequest(BaseModel):
     book_id: str = Field(..., description="이미 등록된 도서의 ID")
-    top_k: int = Field(default=5, ge=1, le=20, description="추천받을 도서 수")
\ No newline at end of file
+    top_k: int = Field(default=5, ge=1, le=20, description="추천받을 도서 수")
+    filters: RecommendationFilter | None = Field(None, description="추천 대상 필터")
+
+
+# ── 여러 감상평 일괄 추천 요청 ──
+class RecommendBatchRequest(BaseModel):
+    reviews: list[Annotated[str, Field(min_length=10)]] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        example=[
+            "우주의 광활함 속에서 인간 존재의 의미를 생각하게 만드는 SF 소설이 읽고 싶다.",
+            "잔잔하지만 오래 여운이 남는 가족 이야기를 찾고 있어요.",
+        ],
+    )
+    top_k: int = Field(default=5, ge=1, le=20, description="감상평별 추천받을 도서 수")
+    filters: RecommendationFilter | None = Field(None, description="추천 대상 필터")
@@ -0,0 +1,17 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+# ── 재임베딩·재색인 작업 상태 ──
+class ReindexStatus(BaseModel):
+    status: str = Field(..., description="idle / running / completed / failed / interrupted(체크포인트만 남음)")
+    target_index: str | None = Field(None, description="새 버전 인덱스 이름")
+    source_indices: list[str] = Field(default=[], description="원본 인덱스 목록")
+    embedding_version: str | None = Field(None, description="새 벡터의 모델·차원·긴 텍스트 설정")
+    total: int = Field(default=0, description="시작 시점 원본 문서 수")
+    processed: int = Field(default=0, description="새 인덱스에 기록한 문서 수")
+    reembedded: int = Field(default=0, description="다시 임베딩한 문서 수")
+    reused: int = Field(default=0, description="내용과 임베딩 버전이 같아 벡터를 재사용한 문서 수")
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
@@ -1,18 +1,123 @@
+import asyncio
+import time
 import httpx
 from app.core.config import get_settings
-from app.schemas.aladin import AladinBookItem, AladinSearchResponse
+from app.core.metrics import ALADIN_REQUEST_DURATION, ALADIN_REQUEST_ERRORS, observe_call
+from app.services.cache import AsyncTTLCache
+from app.schemas.aladin import AladinBatchLookupItem, AladinBookItem, AladinSearchResponse
 
 settings = get_settings()
 
 BASE_URL = "http://www.aladin.co.kr/ttb/api"
 
 
+class _TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷 (업스트림 호출 속도 제한)"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
 class AladinService:
     """알라딘 Open API 서비스"""
     
     def __init__(self):
         self.ttb_key = settings.aladin_api_key
-        self.timeout = httpx.Timeout(10.0)
+        self.timeout = httpx.Timeout(settings.aladin_timeout)
+        self.limits = httpx.Limits(
+            max_connections=settings.aladin_max_connections,
+            max_keepalive_connections=settings.aladin_max_keepalive_connections,
+            keepalive_expiry=settings.aladin_keepalive_expiry,
+        )
+        # 엔드포인트별 타임아웃 (검색은 느리고, 단건 조회는 빠르게 실패)
+        self.endpoint_timeouts = {
+            "ItemSearch.aspx": httpx.Timeout(settings.aladin_search_timeout),
+            "ItemLookUp.aspx": httpx.Timeout(settings.aladin_lookup_timeout),
+            "ItemList.aspx": httpx.Timeout(settings.aladin_list_timeout),
+        }
+        self._client: httpx.AsyncClient | None = None
+        self._rate_limiter = _TokenBucket(
+            rate=settings.aladin_rate_limit_per_second,
+            burst=settings.aladin_rate_limit_burst,
+        )
+        
+        # 응답 캐시: 엔드포인트별 TTL + stale-while-revalidate + 동시 요청 합치기
+        self.endpoint_ttls = {
+            "ItemSearch.aspx": settings.aladin_search_ttl,
+            "ItemLookUp.aspx": settings.aladin_lookup_ttl,
+            "ItemList.aspx": settings.aladin_bestseller_ttl,
+        }
+        self.cache: AsyncTTLCache | None = None
+        if settings.aladin_cache_enabled:
+            self.cache = AsyncTTLCache(max_size=settings.aladin_cache_size)
+    
+    # ── 연결 관리 ──
+    
+    def start(self) -> None:
+        """커넥션 풀을 가진 공용 HTTP 클라이언트를 생성합니다."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=BASE_URL,
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+    
+    async def close(self) -> None:
+        """공용 HTTP 클라이언트를 종료합니다."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get(self, endpoint: str, params: dict) -> dict:
+        """캐시를 거쳐 GET 요청 (응답 JSON을 캐시하므로 호출자마다 새 모델을 만듭니다)"""
+        if self.cache is None:
+            return await self._fetch(endpoint, params)
+        
+        key = (endpoint, tuple(sorted((k, v) for k, v in params.items() if k != "ttbkey")))
+        return await self.cache.get_or_load(
+            key,
+            lambda: self._fetch(endpoint, params),
+            ttl=self.endpoint_ttls.get(endpoint, 0.0),
+            stale_ttl=settings.aladin_cache_stale_ttl,
+        )
+    
+    async def _fetch(self, endpoint: str, params: dict) -> dict:
+        """공용 클라이언트로 GET 요청 (lifespan 밖에서 호출되면 지연 생성, 오류 본문은 예외로 변환)"""
+        if self._client is None:
+            self.start()
+        await self._rate_limiter.acquire()
+        with observe_call(ALADIN_REQUEST_DURATION, ALADIN_REQUEST_ERRORS, endpoint=endpoint):
+            response = await self._client.get(
+                f"/{endpoint}",
+                params=params,
+                timeout=self.endpoint_timeouts.get(endpoint, self.timeout),
+            )
+            response.raise_for_status()
+            data = response.json()
+            # 알라딘은 키 오류·호출 한도 초과 등을 HTTP 200 + errorCode 본문으로 알려 줍니다.
+            # 실패로 처리해야 오류 응답이 캐시에 저장되지 않습니다.
+            if "errorCode" in data:
+                raise RuntimeError(f"[{data['errorCode']}] {data.get('errorMessage', '')}".strip())
+            return data
     
     def _is_available(self) -> bool:
         """API 키가 설정되어 있는지 확인"""
@@ -54,12 +159,7 @@ class AladinService:
             "start": start,
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{BASE_URL}/ItemSearch.aspx", params=params
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get("ItemSearch.aspx", params)
         
         return AladinSearchResponse(**data)
     
@@ -82,12 +182,7 @@ class AladinService:
             "ItemId": isbn,
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{BASE_URL}/ItemLookUp.aspx", params=params
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get("ItemLookUp.aspx", params)
         
         items = data.get("item", [])
         if not items:
@@ -95,6 +190,25 @@ class AladinService:
         
         return AladinBookItem(**items[0])
     
+    async def lookup_many(self, isbns: list[str]) -> list[AladinBatchLookupItem]:
+        """
+        여러 ISBN을 동시에 조회합니다. (최대 동시 실행 수 + 속도 제한 적용)
+        결과는 입력 순서대로 반환하며, 실패한 항목은 error에 사유를 담습니다.
+        """
+        semaphore = asyncio.Semaphore(settings.aladin_batch_concurrency)
+        
+        async def lookup(isbn: str) -> AladinBatchLookupItem:
+            async with semaphore:
+                try:
+                    book = await self.lookup_by_isbn(isbn)
+                except Exception as e:
+                    return AladinBatchLookupItem(isbn=isbn, error=f"알라딘 API 호출 실패: {e}")
+            if book is None:
+                return AladinBatchLookupItem(isbn=isbn, error="해당 ISBN의 도서를 찾을 수 없습니다.")
+            return AladinBatchLookupItem(isbn=isbn, book=book)
+        
+        return list(await asyncio.gather(*(lookup(isbn) for isbn in isbns)))
+    
     async def get_bestsellers(
         self,
         category_id: int = 0,
@@ -118,12 +232,7 @@ class AladinService:
             "CategoryId": category_id,
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(
-                f"{BASE_URL}/ItemList.aspx", params=params
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get("ItemList.aspx", params)
         
         return AladinSearchResponse(**data)
 
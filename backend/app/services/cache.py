@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class AsyncTTLCache:
+    """
+    비동기 로더용 TTL 캐시
+    - ttl 이내: 캐시된 값을 반환
+    - ttl 경과 후 stale_ttl 이내: 이전 값을 즉시 반환하고 백그라운드에서 갱신 (stale-while-revalidate)
+    - 같은 키의 동시 요청은 하나의 로더 호출로 합칩니다 (single-flight)
+    - 최대 max_size개, 초과 시 가장 오래 사용하지 않은 항목부터 제거
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_errors = 0
+        
+        # key → (값, 저장 시각)
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+    
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age < ttl + stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader, background=True)
+                return value
+        
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._start_load(key, loader)
+        else:
+            self.coalesced += 1
+        
+        # 한 호출자가 취소돼도 공유 로더는 계속 실행되도록 shield
+        return await asyncio.shield(task)
+    
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        background: bool = False,
+    ) -> asyncio.Task:
+        async def load() -> Any:
+            try:
+                value = await loader()
+            except Exception:
+                self.load_errors += 1
+                if background:
+                    # 백그라운드 갱신 실패 시 기존(stale) 값을 유지합니다
+                    return None
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            self._store(key, value)
+            return value
+        
+        task = asyncio.create_task(load())
+        self._inflight[key] = task
+        return task
+    
+    def _store(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        total = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "load_errors": self.load_errors,
+            "hit_rate": round((total - self.misses) / total, 4) if total else 0.0,
+        }
@@ -1,12 +1,92 @@
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterable, AsyncIterator
 from datetime import datetime, timezone
 from uuid import uuid4
-from elasticsearch import AsyncElasticsearch
+from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch.helpers import async_scan, async_streaming_bulk
 from app.core.config import get_settings
-from app.schemas.book import BookCreateRequest, BookDocument, BookResponse, RecommendationResponse
-from app.services.embedding import get_embedding_service
+from app.core.metrics import ES_REQUEST_DURATION, ES_REQUEST_ERRORS, observe_call
+from app.schemas.book import (
+    BookCreateRequest,
+    BookDocument,
+    BookResponse,
+    BulkIndexResponse,
+    BulkItemResult,
+    RecommendationResponse,
+)
+from app.schemas.recommendation import RecommendationFilter
+from app.services.embedding import get_embedding_service, truncate_embedding
+from app.services.similar_cache import SimilarBooksCache
+from app.services.vector_store import LocalVectorStore
 
 settings = get_settings()
 
+# refresh 정책 → ES refresh 파라미터
+#   immediate: 쓰기 직후 샤드를 강제 refresh (즉시 검색 가능, 세그먼트 증가)
+#   wait_for : 다음 주기적 refresh까지 응답을 대기 (read-your-writes 보장)
+#   none     : 기다리지 않음 (refresh_interval 주기에 맡김)
+REFRESH_POLICIES = {"immediate": "true", "wait_for": "wait_for", "none": "false"}
+
+# 읽기 경로에서 _source로 가져오지 않을 필드 (1024차원 벡터 ≈ 히트당 20KB)
+VECTOR_FIELDS = {"embedding", "embedding_coarse"}
+SOURCE_EXCLUDES = sorted(VECTOR_FIELDS)
+
+# _source에 없는 벡터를 doc values에서 읽는 script_fields
+# (dense_vector는 양자화 인덱스에서도 원본 float 벡터를 보관합니다)
+DOC_VALUE_VECTOR_FIELDS = {
+    "embedding": {
+        "script": {
+            "source": "doc['embedding'].size() == 0 ? null : doc['embedding'].vectorValue"
+        }
+    }
+}
+
+# 목록 정렬 (id로 유일) — PIT 검색은 _shard_doc 값이 뒤에 붙으므로 커서에는 이 키 수만큼만 저장
+_LIST_SORT = [{"created_at": {"order": "desc"}}, {"id": {"order": "desc"}}]
+_CURSOR_KEYS = len(_LIST_SORT)
+
+
+class _CircuitBreaker:
+    """
+    ES 호출 회로 차단기
+    - closed: 정상, 모든 요청 허용
+    - open: 연속 실패가 임계치를 넘으면 reset_timeout 동안 요청을 즉시 거부 (fail fast)
+    - half_open: reset_timeout 경과 후 요청을 다시 허용하고, 다음 결과로 closed/open 결정
+    """
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+    
+    def allow_request(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        return True
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = "closed"
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.trip()
+    
+    def trip(self) -> None:
+        """즉시 차단합니다. (헬스 체크 실패처럼 장애가 확실할 때)"""
+        if self.state != "open":
+            self._opened_at = time.monotonic()
+        self.state = "open"
+
 
 class ElasticsearchService:
     """Elasticsearch 벡터 검색 서비스"""
@@ -15,16 +95,53 @@ class ElasticsearchService:
         self.es = AsyncElasticsearch(hosts=[settings.es_host])
         self.index = settings.es_index
         self.dimension = settings.embedding_dimension
+        
+        # 2단계 검색: 저차원(MRL) 벡터로 kNN 후보를 찾고 전체 벡터로 재점수합니다 (0이면 미사용)
+        self.coarse_dimension = 0
+        if settings.es_two_stage:
+            if settings.es_coarse_dimension < self.dimension:
+                self.coarse_dimension = settings.es_coarse_dimension
+            else:
+                print(
+                    f"⚠️ ES_COARSE_DIMENSION ({settings.es_coarse_dimension}) must be smaller than "
+                    f"EMBEDDING_DIMENSION ({self.dimension}) — two-stage search disabled"
+                )
+        
+        # 백그라운드 헬스 모니터가 갱신하는 연결 상태 (요청마다 ping하지 않음)
+        self.healthy = False
+        self.breaker = _CircuitBreaker(
+            failure_threshold=settings.es_breaker_failure_threshold,
+            reset_timeout=settings.es_breaker_reset_timeout,
+        )
+        self._monitor_task: asyncio.Task | None = None
+        # 로컬 벡터 저장소 동기화 (백그라운드 태스크, 한 번에 하나만 실행)
+        self._sync_task: asyncio.Task | None = None
+        self._sync_lock = asyncio.Lock()
+        
+        # 도서 기반 추천용 이웃 목록 캐시 (쓰기 시 증분 갱신)
+        self.similar_cache: SimilarBooksCache | None = None
+        if settings.similar_cache_enabled:
+            self.similar_cache = SimilarBooksCache(
+                k=settings.similar_cache_k,
+                max_size=settings.similar_cache_size,
+                ttl=settings.similar_cache_ttl,
+            )
+        
+        # VECTOR_BACKEND=local이면 kNN 검색을 프로세스 내 벡터 저장소에서 처리합니다
+        # (ES는 여전히 원본 저장소이며, 저장소는 쓰기 시 함께 갱신됩니다)
+        self.local_store: LocalVectorStore | None = None
+        if settings.vector_backend == "local":
+            self.local_store = LocalVectorStore(
+                settings.local_vector_path,
+                self.dimension,
+                settings.local_vector_dtype,
+            )
     
     # ── 인덱스 관리 ──
     
-    async def create_index_if_not_exists(self) -> None:
-        """벡터 검색용 인덱스를 생성합니다."""
-        if await self.es.indices.exists(index=self.index):
-            print(f"📂 Index '{self.index}' already exists")
-            return
-        
-        mappings = {
+    def _index_body(self) -> dict:
+        """현재 설정 기준의 인덱스 매핑/설정"""
+        body = {
             "mappings": {
                 "properties": {
                     "id": {"type" : "keyword"},
@@ -46,44 +163,201 @@ class ElasticsearchService:
                     "review": {"type": "text", "analyzer": "standard"},
                     "rating": {"type": "float"},
                     "tags": {"type": "keyword"},
-                    "embedding": {
-                        "type": "dense_vector",
-                        "dims": self.dimension,
-                        "index": True,
-                        "similarity": "cosine",
-                    },
+                    "embedding": self._vector_mapping(self.dimension, settings.es_index_type),
+                    "content_hash": {"type": "keyword"},
+                    "embedding_version": {"type": "keyword"},
                     "created_at": {"type": "date"},
                 }
             }
         }
         
-        await self.es.indices.create(index=self.index, body=mappings)
-        print(f"✅ Index '{self.index}' created (dims={self.dimension})")
+        # 2단계 검색: 후보 생성은 저차원 벡터의 HNSW로, 전체 벡터는 재점수용으로만 저장합니다
+        if self.coarse_dimension:
+            properties = body["mappings"]["properties"]
+            properties["embedding_coarse"] = self._vector_mapping(
+                self.coarse_dimension, settings.es_coarse_index_type
+            )
+            if not settings.es_index_full_vector:
+                properties["embedding"] = {
+                    "type": "dense_vector",
+                    "dims": self.dimension,
+                    "index": False,
+                }
+        
+        body["settings"] = {"index": {"refresh_interval": settings.es_refresh_interval}}
+        
+        # 벡터를 저장된 _source에서 제외하면 디스크와 조회 비용이 줄어듭니다
+        # (kNN 검색에는 영향 없음, 대신 _source로 벡터를 다시 읽을 수 없음)
+        if not settings.es_store_vectors_in_source:
+            body["mappings"]["_source"] = {"excludes": SOURCE_EXCLUDES}
+        
+        return body
     
-    async def delete_index(self) -> None:
-        """인덱스를 삭제합니다. (개발용)"""
+    @staticmethod
+    def _vector_mapping(dims: int, index_type: str) -> dict:
+        return {
+            "type": "dense_vector",
+            "dims": dims,
+            "index": True,
+            "similarity": "cosine",
+            # int8_hnsw / int4_hnsw는 벡터를 양자화해 힙 사용량을 4~8배 줄입니다
+            "index_options": {
+                "type": index_type,
+                "m": settings.es_hnsw_m,
+                "ef_construction": settings.es_hnsw_ef_construction,
+            },
+        }
+    
+    def _new_index_name(self) -> str:
+        """alias 뒤에 둘 버전 인덱스 이름 (예: books-20260101120000)"""
+        return f"{self.index}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    
+    async def create_index_if_not_exists(self) -> None:
+        """
+        벡터 검색용 인덱스를 생성합니다.
+        실제 인덱스는 버전 이름으로 만들고 ES_INDEX는 alias로 연결하여
+        이후 migrate_index로 무중단 전환할 수 있게 합니다.
+        """
         if await self.es.indices.exists(index=self.index):
-            await self.es.indices.delete(index=self.index)
-            print(f"🗑️ Index '{self.index}' deleted")
+            print(f"📂 Index '{self.index}' already exists")
+            return
+        
+        body = self._index_body()
+        body["aliases"] = {self.index: {}}
+        
+        index_name = self._new_index_name()
+        await self.es.indices.create(index=index_name, body=body)
+        print(
+            f"✅ Index '{index_name}' created as alias '{self.index}' "
+            f"(dims={self.dimension}, type={settings.es_index_type})"
+        )
     
-    # ── 문서 CRUD ──
+    async def _resolve_indices(self) -> list[str]:
+        """ES_INDEX가 가리키는 실제 인덱스 목록 (alias가 아니면 자기 자신)"""
+        if await self.es.indices.exists_alias(name=self.index):
+            return list((await self.es.indices.get_alias(name=self.index)).keys())
+        if await self.es.indices.exists(index=self.index):
+            return [self.index]
+        return []
     
-    async def index_book(self, request: BookCreateRequest) -> BookResponse:
+    async def migrate_index(self, delete_old: bool = False) -> str:
         """
-        도서를 임베딩하여 ES에 저장합니다.
-        제목 + 저자 + 감상평을 하나의 텍스트로 합쳐서 문서 벡터를 생성합니다.
+        현재 설정(매핑, index_options)으로 새 인덱스를 만들어 문서를 복사한 뒤
+        alias를 원자적으로 전환합니다. 복사 중 들어온 쓰기는 새 인덱스에 반영되지 않으므로
+        쓰기가 없는 시점에 실행해 주세요.
+        
+        - ES_INDEX가 alias가 아닌 실제 인덱스(기존 배포)라면 전환과 동시에 삭제합니다.
+        - delete_old=True면 이전 버전 인덱스를 전환 후 삭제합니다.
         """
-        embedding_service = get_embedding_service()
+        old_indices = await self._resolve_indices()
+        if not old_indices:
+            raise RuntimeError(f"Index '{self.index}' does not exist")
         
-        # 문서용 텍스트 조합
-        doc_text = f"{request.title} - {request.author}. {request.review}"
-        embedding = embedding_service.encode_document(doc_text)
+        for old_index in old_indices:
+            mapping = await self.es.indices.get_mapping(index=old_index)
+            source_excludes = (
+                mapping[old_index]["mappings"].get("_source", {}).get("excludes", [])
+            )
+            if "embedding" in source_excludes:
+                raise RuntimeError(
+                    f"Index '{old_index}' does not keep vectors in _source; "
+                    "documents must be re-embedded instead of copied"
+                )
+        
+        new_index = self._new_index_name()
+        await self.es.indices.create(index=new_index, body=self._index_body())
         
-        doc_id = str(uuid4())
-        now = datetime.now(timezone.utc)
+        # 대용량 복사는 클라이언트 타임아웃을 넘기므로 태스크로 실행 후 폴링합니다
+        task = await self.es.reindex(
+            source={"index": old_indices},
+            dest={"index": new_index},
+            script=self._reindex_script(),
+            wait_for_completion=False,
+        )
+        while True:
+            status = await self.es.tasks.get(task_id=task["task"])
+            if status["completed"]:
+                break
+            await asyncio.sleep(1)
         
-        document = BookDocument(
-            id=doc_id,
+        failures = status.get("response", {}).get("failures") or status.get("error")
+        if failures:
+            await self.es.indices.delete(index=new_index)
+            raise RuntimeError(f"Reindex into '{new_index}' failed: {failures}")
+        
+        await self.es.indices.refresh(index=new_index)
+        await self.switch_alias(old_indices, new_index, delete_old=delete_old)
+        return new_index
+    
+    async def switch_alias(
+        self,
+        old_indices: list[str],
+        new_index: str,
+        delete_old: bool = False,
+    ) -> None:
+        """
+        ES_INDEX alias를 new_index로 원자적으로 전환합니다.
+        ES_INDEX가 실제 인덱스(기존 배포)라면 전환과 동시에 삭제합니다.
+        """
+        if old_indices == [self.index]:
+            actions = [{"remove_index": {"index": self.index}}]
+        else:
+            actions = [{"remove": {"index": i, "alias": self.index}} for i in old_indices]
+        actions.append({"add": {"index": new_index, "alias": self.index}})
+        await self.es.indices.update_aliases(actions=actions)
+        print(f"🔀 Alias '{self.index}' switched: {', '.join(old_indices)} → {new_index}")
+        
+        if delete_old and old_indices != [self.index]:
+            await self.es.indices.delete(index=",".join(old_indices))
+            print(f"🗑️ Old indices deleted: {', '.join(old_indices)}")
+    
+    async def delete_index(self) -> None:
+        """인덱스를 삭제합니다. (개발용)"""
+        indices = await self._resolve_indices()
+        if indices:
+            await self.es.indices.delete(index=",".join(indices))
+            print(f"🗑️ Index '{self.index}' deleted")
+    
+    # ── 문서 변환 ──
+    
+    @staticmethod
+    def _refresh_param(policy: str | None) -> str:
+        """요청별 정책이 없으면 설정의 기본 refresh 정책을 사용합니다."""
+        return REFRESH_POLICIES[policy or settings.es_refresh_policy]
+    
+    @staticmethod
+    def _doc_text(title: str, author: str, review: str) -> str:
+        """문서용 텍스트 조합: 제목 + 저자 + 감상평"""
+        return f"{title} - {author}. {review}"
+    
+    @staticmethod
+    def _content_hash(doc_text: str) -> str:
+        """문서 텍스트의 SHA-256 (재색인 시 내용이 바뀌지 않은 문서는 재임베딩을 생략)"""
+        return hashlib.sha256(doc_text.encode("utf-8")).hexdigest()
+    
+    def _reindex_script(self) -> dict:
+        """마이그레이션 시 2단계 검색 설정에 맞게 저차원 벡터를 채우거나 제거합니다."""
+        if not self.coarse_dimension:
+            return {"source": "ctx._source.remove('embedding_coarse')"}
+        return {
+            "source": (
+                "def v = ctx._source.embedding;"
+                "if (v != null) {"
+                "  double norm = 0;"
+                "  for (int i = 0; i < params.dims; i++) { norm += v[i] * v[i]; }"
+                "  norm = norm > 0 ? Math.sqrt(norm) : 1;"
+                "  List coarse = new ArrayList();"
+                "  for (int i = 0; i < params.dims; i++) { coarse.add(v[i] / norm); }"
+                "  ctx._source.embedding_coarse = coarse;"
+                "}"
+            ),
+            "params": {"dims": self.coarse_dimension},
+        }
+    
+    def _build_document(self, request: BookCreateRequest, embedding: list[float]) -> BookDocument:
+        doc_text = self._doc_text(request.title, request.author, request.review)
+        return BookDocument(
+            id=str(uuid4()),
             title=request.title,
             author=request.author,
             isbn=request.isbn,
@@ -91,83 +365,294 @@ class ElasticsearchService:
             rating=request.rating,
             tags=request.tags,
             embedding=embedding,
-            created_at=now,
+            embedding_coarse=(
+                truncate_embedding(embedding, self.coarse_dimension)
+                if self.coarse_dimension
+                else None
+            ),
+            content_hash=self._content_hash(doc_text),
+            embedding_version=get_embedding_service().version,
+            created_at=datetime.now(timezone.utc),
+        )
+    
+    def _to_source(self, document: BookDocument) -> dict:
+        """ES에 저장할 _source (2단계 검색을 쓰지 않으면 저차원 벡터 필드는 생략)"""
+        return document.model_dump(exclude=None if self.coarse_dimension else {"embedding_coarse"})
+    
+    @staticmethod
+    def _to_response(source: dict) -> BookResponse:
+        return BookResponse(
+            id=source["id"],
+            title=source["title"],
+            author=source["author"],
+            isbn=source.get("isbn"),
+            review=source["review"],
+            rating=source["rating"],
+            tags=source.get("tags", []),
+            created_at=source["created_at"],
         )
+    
+    # ── 문서 CRUD ──
+    
+    async def index_book(
+        self,
+        request: BookCreateRequest,
+        refresh: str | None = None,
+    ) -> BookResponse:
+        """
+        도서를 임베딩하여 ES에 저장합니다.
+        제목 + 저자 + 감상평을 하나의 텍스트로 합쳐서 문서 벡터를 생성합니다.
+        refresh: immediate / wait_for / none (None이면 ES_REFRESH_POLICY)
+        """
+        embedding_service = get_embedding_service()
+        embedding = await embedding_service.encode_document_async(
+            self._doc_text(request.title, request.author, request.review)
+        )
+        document = self._build_document(request, embedding)
+        
+        with self._observe("index"):
+            await self.es.index(
+                index=self.index,
+                id=document.id,
+                document=self._to_source(document),
+                refresh=self._refresh_param(refresh),
+            )
         
-        await self.es.index(
-            index=self.index,
-            id=doc_id,
-            document=document.model_dump(),
+        if self.local_store is not None:
+            await asyncio.to_thread(
+                self.local_store.add, document.model_dump(exclude=VECTOR_FIELDS), embedding
+            )
+        
+        book = self._to_response(document.model_dump(exclude=VECTOR_FIELDS))
+        if self.similar_cache is not None:
+            await self._update_similar_cache(book, embedding)
+        return book
+    
+    async def index_books_bulk(
+        self,
+        items: AsyncIterable[BookCreateRequest | str],
+        refresh: str | None = None,
+    ) -> BulkIndexResponse:
+        """
+        여러 도서를 청크 단위로 배치 임베딩한 뒤 bulk API로 저장합니다.
+        문자열 항목은 입력 검증 실패 사유로 간주하여 실패로 기록합니다.
+        문서별 refresh는 하지 않으며, 정책이 none이 아니면 마지막에 한 번만 refresh합니다.
+        """
+        results: list[BulkItemResult] = []
+        chunk: list[tuple[int, BookCreateRequest]] = []
+        position = 0
+        
+        async for item in items:
+            if isinstance(item, str):
+                results.append(BulkItemResult(index=position, success=False, error=item))
+            else:
+                chunk.append((position, item))
+                if len(chunk) >= settings.bulk_embedding_chunk_size:
+                    results.extend(await self._index_chunk(chunk))
+                    chunk = []
+            position += 1
+        
+        if chunk:
+            results.extend(await self._index_chunk(chunk))
+        
+        if self._refresh_param(refresh) != "false" and any(r.success for r in results):
+            await self.es.indices.refresh(index=self.index)
+        
+        # 대량 추가는 증분 갱신보다 다시 계산하는 편이 저렴하므로 이웃 캐시를 비웁니다
+        if self.similar_cache is not None and any(r.success for r in results):
+            self.similar_cache.clear()
+        
+        results.sort(key=lambda r: r.index)
+        succeeded = sum(1 for r in results if r.success)
+        return BulkIndexResponse(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            items=results,
         )
+    
+    async def _index_chunk(
+        self,
+        chunk: list[tuple[int, BookCreateRequest]],
+    ) -> list[BulkItemResult]:
+        """청크 하나를 encode_batch로 임베딩하고 bulk 색인합니다."""
+        embedding_service = get_embedding_service()
         
-        # 즉시 검색 가능하도록 refresh
-        await self.es.indices.refresh(index=self.index)
+        try:
+            embeddings = await embedding_service.encode_batch_async(
+                [
+                    self._doc_text(request.title, request.author, request.review)
+                    for _, request in chunk
+                ]
+            )
+        except Exception as e:
+            return [
+                BulkItemResult(index=position, success=False, error=f"임베딩 실패: {e}")
+                for position, _ in chunk
+            ]
         
-        return BookResponse(
-            id=doc_id,
-            title=document.title,
-            author=document.author,
-            isbn=document.isbn,
-            review=document.review,
-            rating=document.rating,
-            tags=document.tags,
-            created_at=document.created_at,
+        documents = [
+            (position, self._build_document(request, embedding))
+            for (position, request), embedding in zip(chunk, embeddings)
+        ]
+        actions = [
+            {"_index": self.index, "_id": document.id, "_source": self._to_source(document)}
+            for _, document in documents
+        ]
+        
+        results = []
+        indexed: list[tuple[dict, list[float]]] = []
+        responses = async_streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=len(actions),
+            raise_on_error=False,
+            raise_on_exception=False,
         )
+        # streaming_bulk는 입력 순서대로 결과를 돌려줍니다
+        position_iter = iter(documents)
+        with self._observe("bulk"):
+            async for ok, info in responses:
+                position, document = next(position_iter)
+                error = None if ok else str(next(iter(info.values())).get("error"))
+                results.append(
+                    BulkItemResult(
+                        index=position,
+                        id=document.id if ok else None,
+                        success=ok,
+                        error=error,
+                    )
+                )
+                if ok and self.local_store is not None:
+                    indexed.append(
+                        (document.model_dump(exclude=VECTOR_FIELDS), document.embedding)
+                    )
+        
+        if indexed:
+            await asyncio.to_thread(self.local_store.add_many, indexed)
+        return results
     
     async def get_book(self, book_id: str) -> BookResponse | None:
         """ID로 도서를 조회합니다."""
         try:
-            result = await self.es.get(index=self.index, id=book_id)
-            source = result["_source"]
-            return BookResponse(
-                id=source["id"],
-                title=source["title"],
-                author=source["author"],
-                isbn=source.get("isbn"),
-                review=source["review"],
-                rating=source["rating"],
-                tags=source.get("tags", []),
-                created_at=source["created_at"],
-            )
-        except Exception:
+            with self._observe("get"):
+                result = await self.es.get(
+                    index=self.index,
+                    id=book_id,
+                    source_excludes=SOURCE_EXCLUDES,
+                )
+            return self._to_response(result["_source"])
+        except NotFoundError:
             return None
     
-    async def get_all_books(self, size: int = 100) -> list[BookResponse]:
-        """등록된 모든 도서를 조회합니다."""
-        result = await self.es.search(
-            index=self.index,
-            body={
-                "query": {"match_all": {}},
-                "size": size,
-                "sort": [{"created_at": {"order": "desc"}}],
-            },
-        )
+    async def get_all_books(
+        self,
+        size: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[BookResponse], str | None]:
+        """
+        등록된 도서를 최신순으로 한 페이지 조회합니다.
+        search_after(created_at, id) 기반 커서 페이지네이션이며,
+        다음 페이지가 없으면 커서로 None을 반환합니다.
+        id로 정렬 키가 유일하므로 PIT 없이도 페이지 사이에 중복이 없고,
+        커서를 따라가지 않는 클라이언트가 검색 컨텍스트를 남기지도 않습니다.
+        """
+        search_after = self._decode_cursor(cursor) if cursor else None
+        hits, _ = await self._search_page(size, None, search_after)
         
-        books = []
-        for hit in result["hits"]["hits"]:
-            source = hit["_source"]
-            books.append(
-                BookResponse(
-                    id=source["id"],
-                    title=source["title"],
-                    author=source["author"],
-                    isbn=source.get("isbn"),
-                    review=source["review"],
-                    rating=source["rating"],
-                    tags=source.get("tags", []),
-                    created_at=source["created_at"],
+        books = [self._to_response(hit["_source"]) for hit in hits]
+        if len(hits) < size:
+            return books, None
+        return books, self._encode_cursor(hits[-1]["sort"])
+    
+    async def iter_books(self) -> AsyncIterator[BookResponse]:
+        """PIT + search_after로 전체 도서를 일정한 메모리로 순회합니다. (내보내기용)"""
+        pit_id = await self._open_pit()
+        search_after = None
+        try:
+            while True:
+                hits, pit_id = await self._search_page(
+                    settings.es_export_batch_size, pit_id, search_after
                 )
-            )
-        return books
+                for hit in hits:
+                    yield self._to_response(hit["_source"])
+                if len(hits) < settings.es_export_batch_size:
+                    break
+                search_after = hits[-1]["sort"]
+        finally:
+            await self._close_pit(pit_id)
+    
+    async def _search_page(
+        self,
+        size: int,
+        pit_id: str | None,
+        search_after: list | None,
+    ) -> tuple[list[dict], str | None]:
+        params = {
+            "size": size,
+            "sort": _LIST_SORT,
+            "source_excludes": SOURCE_EXCLUDES,
+        }
+        if pit_id:
+            params["pit"] = {"id": pit_id, "keep_alive": settings.es_pit_keep_alive}
+        else:
+            params["index"] = self.index
+        if search_after:
+            params["search_after"] = search_after
+        
+        with self._observe("list"):
+            result = await self.es.search(**params)
+        return result["hits"]["hits"], result.get("pit_id", pit_id)
+    
+    async def _open_pit(self) -> str:
+        result = await self.es.open_point_in_time(
+            index=self.index, keep_alive=settings.es_pit_keep_alive
+        )
+        return result["id"]
+    
+    async def _close_pit(self, pit_id: str | None) -> None:
+        if not pit_id:
+            return
+        try:
+            await self.es.close_point_in_time(id=pit_id)
+        except NotFoundError:
+            pass
+    
+    @staticmethod
+    def _encode_cursor(search_after: list) -> str:
+        """커서에는 정렬 키(created_at, id)만 담습니다. (PIT 검색의 _shard_doc 값은 제외)"""
+        raw = json.dumps({"after": search_after[:_CURSOR_KEYS]}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> list:
+        """이전 형식(PIT ID + _shard_doc 포함) 커서도 정렬 키만 꺼내 이어서 조회합니다."""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            after = data["after"]
+            if not isinstance(after, list) or len(after) < _CURSOR_KEYS:
+                raise ValueError(after)
+            return after[:_CURSOR_KEYS]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError("잘못된 커서입니다.") from e
     
-    async def delete_book(self, book_id: str) -> bool:
+    async def delete_book(self, book_id: str, refresh: str | None = None) -> bool:
         """도서를 삭제합니다."""
         try:
-            await self.es.delete(index=self.index, id=book_id)
-            await self.es.indices.refresh(index=self.index)
-            return True
-        except Exception:
+            with self._observe("delete"):
+                await self.es.delete(
+                    index=self.index,
+                    id=book_id,
+                    refresh=self._refresh_param(refresh),
+                )
+        except NotFoundError:
             return False
+        
+        if self.local_store is not None:
+            await asyncio.to_thread(self.local_store.delete, book_id)
+        if self.similar_cache is not None:
+            self.similar_cache.on_delete(book_id)
+        return True
     
     # ── 벡터 검색 (추천) ──
     
@@ -176,91 +661,452 @@ class ElasticsearchService:
         query_vector: list[float],
         top_k: int = 5,
         exclude_id: str | None = None,
+        num_candidates: int | None = None,
+        filters: RecommendationFilter | None = None,
     ) -> list[RecommendationResponse]:
         """
         벡터 유사도 기반으로 유사 도서를 검색합니다.
         ES의 kNN 검색을 사용합니다.
+        num_candidates: 샤드별 HNSW 후보 수 (클수록 recall↑ 지연↑, None이면 설정값)
+        filters / exclude_id: kNN의 filter 절로 전달되어 HNSW 탐색 중에 사전 필터링됩니다.
         """
+        if self.local_store is not None:
+            return await self.local_store.search_similar_by_vector(
+                query_vector, top_k, exclude_id=exclude_id, filters=filters
+            )
+        
+        with self._observe("knn_search"):
+            result = await self.es.search(
+                index=self.index,
+                body=self._knn_search_body(
+                    query_vector, top_k, exclude_id, num_candidates, filters
+                ),
+            )
+        return self._to_recommendations(result["hits"]["hits"])
+    
+    async def search_similar_by_vectors(
+        self,
+        query_vectors: list[list[float]],
+        top_k: int = 5,
+        filters: RecommendationFilter | None = None,
+    ) -> list[list[RecommendationResponse]]:
+        """여러 쿼리 벡터의 kNN 검색을 _msearch 한 번으로 처리합니다."""
+        if self.local_store is not None:
+            return [
+                await self.local_store.search_similar_by_vector(vector, top_k, filters=filters)
+                for vector in query_vectors
+            ]
+        
+        searches = []
+        for vector in query_vectors:
+            searches.append({"index": self.index})
+            searches.append(self._knn_search_body(vector, top_k, filters=filters))
+        
+        with self._observe("knn_msearch"):
+            result = await self.es.msearch(searches=searches)
+        groups = []
+        for response in result["responses"]:
+            if "error" in response:
+                raise RuntimeError(f"kNN search failed: {response['error']}")
+            groups.append(self._to_recommendations(response["hits"]["hits"]))
+        return groups
+    
+    def _knn_search_body(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        exclude_id: str | None = None,
+        num_candidates: int | None = None,
+        filters: RecommendationFilter | None = None,
+    ) -> dict:
+        """kNN 검색 요청 본문 (search / msearch 공용)"""
+        knn_filter = self._build_filter(filters, exclude_id)
+        if self.coarse_dimension:
+            return self._two_stage_search_body(query_vector, top_k, num_candidates, knn_filter)
+        
         knn_query = {
             "field": "embedding",
             "query_vector": query_vector,
-            "k": top_k + (1 if exclude_id else 0),  # 자기 자신 제외 대비
-            "num_candidates": max(top_k * 10, 100),
+            "k": top_k,
+            "num_candidates": self._num_candidates(top_k, num_candidates),
         }
+        if knn_filter is not None:
+            knn_query["filter"] = knn_filter
         
-        result = await self.es.search(
-            index=self.index,
-            knn=knn_query,
-            size=top_k + (1 if exclude_id else 0),
-        )
+        return {
+            "knn": knn_query,
+            "size": top_k,
+            "_source": {"excludes": SOURCE_EXCLUDES},
+        }
+    
+    def _two_stage_search_body(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        num_candidates: int | None,
+        knn_filter: dict | None,
+    ) -> dict:
+        """
+        2단계 검색 본문
+        1) 저차원 벡터(embedding_coarse)의 knn 쿼리로 후보 생성 (필터는 HNSW 탐색 중 적용)
+        2) 샤드별 상위 window개를 전체 벡터와의 코사인 유사도로 재점수
+        점수는 1단계 kNN과 같은 (1 + cos) / 2 스케일입니다.
+        """
+        window = max(settings.es_rescore_window, top_k)
+        knn_query = {
+            "field": "embedding_coarse",
+            "query_vector": truncate_embedding(query_vector, self.coarse_dimension),
+            "num_candidates": self._num_candidates(window, num_candidates),
+        }
+        if knn_filter is not None:
+            knn_query["filter"] = knn_filter
         
-        recommendations = []
-        for hit in result["hits"]["hits"]:
-            source = hit["_source"]
-            
-            # 자기 자신 제외
-            if exclude_id and source["id"] == exclude_id:
-                continue
-            
-            book = BookResponse(
-                id=source["id"],
-                title=source["title"],
-                author=source["author"],
-                isbn=source.get("isbn"),
-                review=source["review"],
-                rating=source["rating"],
-                tags=source.get("tags", []),
-                created_at=source["created_at"],
-            )
-            recommendations.append(
-                RecommendationResponse(
-                    book=book,
-                    score=round(hit["_score"], 4),
-                )
+        return {
+            "query": {"knn": knn_query},
+            "rescore": {
+                "window_size": window,
+                "query": {
+                    "rescore_query": {
+                        "script_score": {
+                            "query": {"match_all": {}},
+                            "script": {
+                                "source": "(cosineSimilarity(params.query_vector, 'embedding') + 1.0) / 2.0",
+                                "params": {"query_vector": query_vector},
+                            },
+                        }
+                    },
+                    "query_weight": 0.0,
+                    "rescore_query_weight": 1.0,
+                },
+            },
+            "size": top_k,
+            "_source": {"excludes": SOURCE_EXCLUDES},
+        }
+    
+    def _to_recommendations(self, hits: list[dict]) -> list[RecommendationResponse]:
+        return [
+            RecommendationResponse(
+                book=self._to_response(hit["_source"]),
+                score=round(hit["_score"], 4),
             )
-            
-            if len(recommendations) >= top_k:
-                break
+            for hit in hits
+        ]
+    
+    @staticmethod
+    def _build_filter(
+        filters: RecommendationFilter | None,
+        exclude_id: str | None = None,
+    ) -> dict | None:
+        """추천 필터를 kNN filter용 bool 쿼리로 변환합니다."""
+        clauses = []
+        if filters is not None:
+            if filters.tags:
+                clauses.append({"terms": {"tags": filters.tags}})
+            if filters.min_rating is not None:
+                clauses.append({"range": {"rating": {"gte": filters.min_rating}}})
+            if filters.created_from or filters.created_to:
+                date_range = {}
+                if filters.created_from:
+                    date_range["gte"] = filters.created_from.isoformat()
+                if filters.created_to:
+                    date_range["lte"] = filters.created_to.isoformat()
+                clauses.append({"range": {"created_at": date_range}})
+        
+        # 자기 자신 제외: k+1개를 가져와 거르는 대신 must_not으로 후보에서 제외
+        must_not = [{"ids": {"values": [exclude_id]}}] if exclude_id else []
         
-        return recommendations
+        if not clauses and not must_not:
+            return None
+        return {"bool": {"filter": clauses, "must_not": must_not}}
+    
+    @staticmethod
+    def _num_candidates(top_k: int, num_candidates: int | None) -> int:
+        if num_candidates:
+            return max(num_candidates, top_k)
+        if settings.es_knn_num_candidates:
+            return max(settings.es_knn_num_candidates, top_k)
+        return max(top_k * 10, 100)
     
     async def search_similar_by_review(
         self,
         review: str,
         top_k: int = 5,
+        filters: RecommendationFilter | None = None,
     ) -> list[RecommendationResponse]:
         """감상평 텍스트로 유사 도서를 추천합니다."""
         embedding_service = get_embedding_service()
-        query_vector = embedding_service.encode_review(review)
-        return await self.search_similar_by_vector(query_vector, top_k)
+        query_vector = await embedding_service.encode_review_async(review)
+        return await self.search_similar_by_vector(query_vector, top_k, filters=filters)
+    
+    async def search_similar_by_reviews(
+        self,
+        reviews: list[str],
+        top_k: int = 5,
+        filters: RecommendationFilter | None = None,
+    ) -> list[list[RecommendationResponse]]:
+        """
+        여러 감상평을 한 번의 배치 임베딩과 한 번의 _msearch로 추천합니다.
+        단건 추천과 같은 쿼리 캐시를 거치므로 캐시에 없는 감상평만 추론합니다.
+        """
+        embedding_service = get_embedding_service()
+        query_vectors = await embedding_service.encode_reviews_async(reviews)
+        return await self.search_similar_by_vectors(query_vectors, top_k, filters=filters)
     
     async def search_similar_by_book_id(
         self,
         book_id: str,
         top_k: int = 5,
+        filters: RecommendationFilter | None = None,
     ) -> list[RecommendationResponse] | None:
-        """기존 등록 도서 기준으로 유사 도서를 추천합니다."""
-        try:
-            result = await self.es.get(index=self.index, id=book_id)
-            source = result["_source"]
-            query_vector = source["embedding"]
+        """
+        기존 등록 도서 기준으로 유사 도서를 추천합니다.
+        미리 계산된 이웃 목록이 있으면 ES 호출 없이 바로 반환합니다. (필터가 없을 때)
+        """
+        if filters is not None and not filters.is_empty():
+            try:
+                query_vector = await self._get_book_vector(book_id)
+            except NotFoundError:
+                return None
             return await self.search_similar_by_vector(
-                query_vector, top_k, exclude_id=book_id
+                query_vector, top_k, exclude_id=book_id, filters=filters
+            )
+        
+        cache = self.similar_cache
+        if cache is not None and (cached := cache.get(book_id, top_k)) is not None:
+            return cached
+        
+        try:
+            query_vector = await self._get_book_vector(book_id)
+            results = await self.search_similar_by_vector(
+                query_vector,
+                max(top_k, cache.k) if cache is not None else top_k,
+                exclude_id=book_id,
+            )
+        except NotFoundError:
+            return None
+        
+        if cache is not None:
+            cache.put(book_id, results)
+        return results[:top_k]
+    
+    async def _update_similar_cache(self, book: BookResponse, embedding: list[float]) -> None:
+        """새 도서의 이웃을 계산하고, 새 도서가 다른 도서의 top-k에 들어가면 반영합니다."""
+        try:
+            results = await self.search_similar_by_vector(
+                embedding,
+                settings.similar_cache_fanout,
+                exclude_id=book.id,
             )
         except Exception:
+            # 증분 갱신에 실패하면 잘못된 목록이 남지 않도록 전체를 비웁니다
+            self.similar_cache.clear()
+            return
+        self.similar_cache.on_insert(book, results)
+    
+    async def _get_book_vector(self, book_id: str) -> list[float]:
+        """
+        도서의 저장된 벡터를 가져옵니다.
+        _source에 벡터가 있으면 벡터 필드만 읽고,
+        _source에서 제외된 인덱스라면 doc values에서 벡터를 읽습니다. (재임베딩 없음)
+        아직 검색에 반영되지 않은 새 문서처럼 둘 다 없을 때만 저장된 텍스트로 다시 임베딩합니다.
+        """
+        if self.local_store is not None:
+            await self.local_store.catch_up()
+            vector = self.local_store.get_vector(book_id)
+            if vector is not None:
+                return vector
+        
+        if not settings.es_store_vectors_in_source:
+            vector = await self._get_doc_value_vector(book_id)
+            if vector is not None:
+                return vector
+        
+        with self._observe("get_vector"):
+            result = await self.es.get(
+                index=self.index,
+                id=book_id,
+                source_includes=["embedding", "title", "author", "review"],
+            )
+        source = result["_source"]
+        if source.get("embedding"):
+            return source["embedding"]
+        
+        embedding_service = get_embedding_service()
+        return await embedding_service.encode_document_async(
+            self._doc_text(source["title"], source["author"], source["review"])
+        )
+    
+    async def _get_doc_value_vector(self, book_id: str) -> list[float] | None:
+        """
+        _source에 없는 벡터를 script_fields로 doc values에서 읽습니다.
+        검색 기반이므로 refresh 전 문서나 벡터가 없는 문서는 None을 반환합니다.
+        """
+        with self._observe("get_vector"):
+            result = await self.es.search(
+                index=self.index,
+                query={"ids": {"values": [book_id]}},
+                size=1,
+                source=False,
+                script_fields=DOC_VALUE_VECTOR_FIELDS,
+            )
+        hits = result["hits"]["hits"]
+        if not hits:
+            return None
+        return self._doc_value_vector(hits[0])
+    
+    @staticmethod
+    def _doc_value_vector(hit: dict) -> list[float] | None:
+        """DOC_VALUE_VECTOR_FIELDS로 요청한 히트에서 벡터를 꺼냅니다. (없으면 None)"""
+        values = hit.get("fields", {}).get("embedding")
+        if not values or values[0] is None:
             return None
+        return values
+    
+    # ── 로컬 벡터 저장소 동기화 ──
+    
+    def start_local_store_sync(self) -> None:
+        """sync_local_store를 백그라운드 태스크로 시작합니다. (이미 실행 중이면 무시)"""
+        if self.local_store is None or (self._sync_task is not None and not self._sync_task.done()):
+            return
+        self._sync_task = asyncio.create_task(self.sync_local_store())
+        self._sync_task.add_done_callback(self._on_sync_done)
+    
+    def _on_sync_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and (error := task.exception()) is not None:
+            print(f"⚠️ Local vector store sync failed: {error!r}")
+    
+    async def sync_local_store(self, force: bool = False) -> None:
+        """
+        로컬 벡터 저장소의 문서 수가 ES와 다르면 ES 전체를 읽어 다시 채웁니다.
+        _source에 벡터가 없는 인덱스는 저장된 텍스트로 다시 임베딩합니다.
+        force=True면 문서 수와 관계없이 다시 채웁니다. (재임베딩 후)
+        동시에 호출되면 앞선 동기화가 끝난 뒤 차례로 실행합니다.
+        """
+        if self.local_store is None:
+            return
+        async with self._sync_lock:
+            await self._sync_local_store(force)
+    
+    async def _sync_local_store(self, force: bool) -> None:
+        es_count = (await self.es.count(index=self.index))["count"]
+        # 다른 워커가 이미 채웠을 수 있으므로 공유 저장소의 최신 상태와 비교합니다
+        await self.local_store.catch_up()
+        if es_count == len(self.local_store) and not force:
+            print(f"✅ Local vector store in sync ({es_count} vectors)")
+            return
+        
+        print(f"🔄 Rebuilding local vector store from ES ({es_count} documents)")
+        await asyncio.to_thread(self.local_store.clear)
+        embedding_service = get_embedding_service()
+        
+        batch: list[dict] = []
+        
+        async def flush() -> None:
+            missing = [source for source in batch if not source.get("embedding")]
+            if missing:
+                vectors = await embedding_service.encode_batch_async(
+                    [self._doc_text(m["title"], m["author"], m["review"]) for m in missing]
+                )
+                for source, vector in zip(missing, vectors):
+                    source["embedding"] = vector
+            await asyncio.to_thread(
+                self.local_store.add_many,
+                [
+                    ({k: v for k, v in source.items() if k not in VECTOR_FIELDS}, source["embedding"])
+                    for source in batch
+                ],
+            )
+            batch.clear()
+        
+        async for hit in async_scan(self.es, index=self.index, query={"query": {"match_all": {}}}):
+            batch.append(hit["_source"])
+            if len(batch) >= settings.bulk_embedding_chunk_size:
+                await flush()
+        if batch:
+            await flush()
+        
+        print(f"✅ Local vector store rebuilt ({len(self.local_store)} vectors)")
     
     # ── 연결 관리 ──
     
+    @staticmethod
+    def _observe(operation: str):
+        """ES 호출 시간/실패 수 계측 (문서 없음은 실패로 세지 않습니다)"""
+        return observe_call(
+            ES_REQUEST_DURATION, ES_REQUEST_ERRORS, ignore=(NotFoundError,), operation=operation
+        )
+    
     async def ping(self) -> bool:
         """ES 연결 상태를 확인합니다."""
         try:
-            return await self.es.ping()
+            return await self.es.options(request_timeout=settings.es_health_timeout).ping()
         except Exception:
             return False
     
+    def is_available(self) -> bool:
+        """
+        캐시된 연결 상태와 회로 차단기로 ES 사용 가능 여부를 판단합니다. (네트워크 호출 없음)
+        차단기가 열려 있으면 False를 반환하여 라우트가 즉시 503으로 응답하게 합니다.
+        """
+        return self.breaker.allow_request()
+    
+    def record_failure(self) -> None:
+        """요청 처리 중 ES 연결 오류가 발생했음을 기록합니다."""
+        self.healthy = False
+        self.breaker.record_failure()
+    
+    async def check_health(self) -> bool:
+        """ES에 ping하여 연결 상태와 차단기를 갱신합니다."""
+        was_healthy = self.healthy
+        self.healthy = await self.ping()
+        if self.healthy:
+            self.breaker.record_success()
+            if not was_healthy:
+                await self._on_connected()
+        else:
+            self.breaker.trip()
+        return self.healthy
+    
+    async def _on_connected(self) -> None:
+        """
+        ES에 (다시) 연결되었을 때 인덱스를 준비하고 로컬 벡터 저장소 동기화를 시작합니다.
+        동기화는 전체 스캔과 재임베딩(모델 로드 대기)을 포함할 수 있으므로
+        기동과 헬스 모니터를 막지 않도록 백그라운드에서 실행합니다.
+        """
+        try:
+            await self.create_index_if_not_exists()
+        except Exception as e:
+            print(f"⚠️ Index preparation failed: {e}")
+            return
+        self.start_local_store_sync()
+    
+    def start_health_monitor(self) -> None:
+        """ES_HEALTH_INTERVAL 간격으로 연결 상태를 확인하는 백그라운드 태스크를 시작합니다."""
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor())
+    
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(settings.es_health_interval)
+            was_healthy = self.healthy
+            healthy = await self.check_health()
+            if healthy != was_healthy:
+                print("✅ Elasticsearch connected" if healthy else "⚠️ Elasticsearch disconnected")
+    
     async def close(self) -> None:
-        """ES 클라이언트 연결을 종료합니다."""
+        """헬스 모니터, 로컬 벡터 저장소(동기화 포함), ES 클라이언트 연결을 종료합니다."""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._sync_task = None
+        if self.local_store is not None:
+            self.local_store.close()
         await self.es.close()
 
 
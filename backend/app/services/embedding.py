@@ -1,14 +1,55 @@
-import torch
-import torch.nn.functional as F
-from torch import Tensor
-from transformers import AutoTokenizer, AutoModel
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
+import numpy as np
 from app.core.config import get_settings
+from app.core.metrics import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_IN_FLIGHT,
+    EMBEDDING_STAGE_DURATION,
+    EMBEDDING_TEXT_TOKENS,
+)
+from app.core.timing import phase_timer
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_worker import EmbeddingWorkerClient
+
+# torch/transformers는 import만으로 수 초가 걸리므로 모델 로드 시점에 불러옵니다
+if TYPE_CHECKING:
+    from torch import Tensor
+    from app.services.embedding_backends import OnnxBackend, TorchBackend
 
 settings = get_settings()
 
+# 추천 쿼리(감상평)에 부여하는 태스크 지시문
+REVIEW_TASK = (
+    "Given a book review, retrieve books with similar themes, "
+    "emotions, and reading experience"
+)
+
+# head_tail truncation에서 앞부분에 할당하는 토큰 비율
+_HEAD_TAIL_HEAD_RATIO = 0.25
+
+# 긴 텍스트 처리 방식과 청크 벡터 결합 방식
+LONG_TEXT_MODES = ("truncate", "chunk")
+CHUNK_POOLING_STRATEGIES = ("mean", "weighted", "max")
+
+# 프로세스 실행기의 워커 프로세스 안에서 실행 중인지 여부
+_in_worker_process = False
+
+# 공유 임베딩 워커(python -m app.services.embedding_worker) 안에서 실행 중인지 여부
+_in_worker_server = False
 
-def _last_token_pool(last_hidden_state: Tensor, attention_mask: Tensor) -> Tensor:
+
+def _last_token_pool(last_hidden_state: "Tensor", attention_mask: "Tensor") -> "Tensor":
     """Qwen3-Embedding은 마지막 토큰 풀링을 사용합니다."""
+    import torch
+    
     left_padding = attention_mask[:, -1].sum() == attention_mask.shape[0]
     if left_padding:
         return last_hidden_state[:, -1]
@@ -21,6 +62,145 @@ def _last_token_pool(last_hidden_state: Tensor, attention_mask: Tensor) -> Tenso
         ]
 
 
+def _pool_and_normalize(
+    last_hidden_state: "Tensor",
+    attention_mask: "Tensor",
+    dimension: int,
+) -> "Tensor":
+    """모든 추론 백엔드가 공유하는 후처리: 마지막 토큰 풀링 → MRL 잘라내기 → L2 정규화"""
+    import torch.nn.functional as F
+    
+    embeddings = _last_token_pool(last_hidden_state, attention_mask)
+    
+    # MRL: 지정된 차원으로 잘라내기
+    if dimension < embeddings.shape[-1]:
+        embeddings = embeddings[:, :dimension]
+    
+    # L2 정규화
+    return F.normalize(embeddings, p=2, dim=1).cpu()
+
+
+def truncate_embedding(vector: list[float], dimension: int) -> list[float]:
+    """
+    정규화된 임베딩을 앞 dimension차원으로 잘라 다시 L2 정규화합니다. (MRL)
+    재추론 없이 전체 벡터에서 저차원 벡터를 얻을 때 사용합니다.
+    """
+    head = vector[:dimension]
+    norm = math.sqrt(sum(x * x for x in head)) or 1.0
+    return [x / norm for x in head]
+
+
+def _pool_chunks(vectors: list[list[float]], weights: list[int], strategy: str) -> list[float]:
+    """
+    청크 벡터들을 하나로 결합한 뒤 다시 L2 정규화합니다.
+    - mean: 단순 평균
+    - weighted: 청크 토큰 수로 가중 평균 (짧은 마지막 청크의 영향 축소)
+    - max: 차원별 최댓값
+    """
+    array = np.asarray(vectors, dtype=np.float32)
+    if strategy == "max":
+        pooled = array.max(axis=0)
+    elif strategy == "weighted":
+        pooled = np.average(array, axis=0, weights=weights)
+    else:
+        pooled = array.mean(axis=0)
+    norm = float(np.linalg.norm(pooled)) or 1.0
+    return (pooled / norm).tolist()
+
+
+def _length_buckets(lengths: list[int], max_batch_tokens: int) -> list[list[int]]:
+    """
+    길이순으로 정렬한 인덱스를 (최대 길이 × 개수)가 토큰 예산을 넘지 않는 묶음으로 나눕니다.
+    각 묶음은 원래 입력의 인덱스 목록입니다.
+    """
+    buckets: list[list[int]] = []
+    current: list[int] = []
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # 오름차순이므로 현재 항목이 묶음의 최대 길이가 됩니다 (8의 배수로 패딩)
+        padded = -(-lengths[i] // 8) * 8
+        if current and padded * (len(current) + 1) > max_batch_tokens:
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+class _MicroBatcher:
+    """
+    동시에 들어온 단건 인코딩 요청을 짧은 시간 동안 모아
+    한 번의 forward pass로 처리한 뒤 각 호출자에게 결과를 돌려줍니다.
+    이벤트 루프에서는 토큰화하지 않습니다. 토큰 예산에 따른 길이별 분할은
+    모인 배치를 실행기에서 한 번 토큰화한 뒤 _encode가 수행합니다.
+    """
+    
+    def __init__(
+        self,
+        run_batch: Callable[[list[str]], Awaitable[list[list[float]]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_concurrent_batches: int = 1,
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_batches))
+        self._task: asyncio.Task | None = None
+        # 실행 중인 배치 태스크 (참조를 유지해야 실행 중에 GC되지 않습니다)
+        self._flushes: set[asyncio.Task] = set()
+    
+    async def submit(self, text: str) -> list[float]:
+        """텍스트를 큐에 넣고 배치 처리 결과를 기다립니다."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            # 실행 슬롯이 빌 때까지 기다리는 동안 요청이 큐에 쌓입니다
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _flush(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self._run_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), embedding in zip(batch, results):
+                if not future.done():
+                    future.set_result(embedding)
+        finally:
+            self._slots.release()
+
+
 class EmbeddingService:
     """Qwen3-Embedding 기반 텍스트 임베딩 서비스"""
     
@@ -28,16 +208,269 @@ class EmbeddingService:
         self.device = settings.embedding_device
         self.dimension = settings.embedding_dimension
         self.model_name = settings.embedding_model_name
+        self.executor_type = settings.embedding_executor
+        self.max_workers = settings.embedding_max_workers
+        self.max_length = settings.embedding_max_length
+        self.truncation = settings.embedding_truncation
+        
+        # 긴 텍스트 청크 분할 (임계치를 넘는 텍스트만 나눠 forward pass당 길이를 제한)
+        self.long_text = settings.embedding_long_text
+        self.chunk_threshold = settings.embedding_chunk_threshold
+        self.chunk_size = settings.embedding_chunk_size
+        self.chunk_overlap = settings.embedding_chunk_overlap
+        self.chunk_pooling = settings.embedding_chunk_pooling
+        if self.long_text not in LONG_TEXT_MODES:
+            raise ValueError(
+                f"Unknown EMBEDDING_LONG_TEXT: {self.long_text} "
+                f"(지원: {', '.join(LONG_TEXT_MODES)})"
+            )
+        if self.chunk_pooling not in CHUNK_POOLING_STRATEGIES:
+            raise ValueError(
+                f"Unknown EMBEDDING_CHUNK_POOLING: {self.chunk_pooling} "
+                f"(지원: {', '.join(CHUNK_POOLING_STRATEGIES)})"
+            )
+        if not 0 <= self.chunk_overlap < self.chunk_size:
+            raise ValueError("EMBEDDING_CHUNK_OVERLAP은 0 이상, EMBEDDING_CHUNK_SIZE 미만이어야 합니다.")
+        
+        self.backend: "TorchBackend | OnnxBackend | None" = None
+        self.tokenizer = None
+        self._executor: Executor | None = None
+        self._batcher: _MicroBatcher | None = None
+        self._batcher_loop: asyncio.AbstractEventLoop | None = None
+        
+        # EMBEDDING_WORKER_SOCKET이 있으면 모델을 로드하지 않고 공유 워커에 추론을 맡깁니다
+        self.remote: EmbeddingWorkerClient | None = None
+        if settings.embedding_worker_socket and not (_in_worker_process or _in_worker_server):
+            self.remote = EmbeddingWorkerClient(
+                settings.embedding_worker_socket,
+                settings.embedding_worker_timeout,
+                batch_size=settings.embedding_batch_max_size,
+            )
+        
+        # 쿼리 임베딩 캐시 (워커는 호출 측 캐시를 쓰므로 생략)
+        # 문서 벡터는 한 번 쓰고 마는 경우가 대부분이라 감상평 쿼리만 캐시합니다
+        self.cache: EmbeddingCache | None = None
+        if settings.embedding_cache_enabled and not (_in_worker_process or _in_worker_server):
+            # 청크 모드는 긴 텍스트의 벡터가 달라지므로 캐시 키 공간을 분리합니다
+            self.cache = EmbeddingCache(
+                model_name=self.model_name + self.long_text_signature,
+                dimension=self.dimension,
+                max_size=settings.embedding_cache_size,
+                path=settings.embedding_cache_path,
+            )
+        # 캐시 키 → 진행 중인 쿼리 벡터 추론 (같은 쿼리의 동시 요청은 한 번만 추론)
+        self._inflight: dict[str, asyncio.Future] = {}
+        
+        # 모델 로드 상태 (생성자는 가볍게 유지하고 load()에서 무거운 작업을 수행합니다)
+        self.ready = False
+        self.load_error: str | None = None
+        self.load_timings: dict[str, float] = {}
+        self._load_lock = threading.Lock()
+        self._load_future: asyncio.Future | None = None
+    
+    @property
+    def chunking(self) -> bool:
+        return self.long_text == "chunk"
+    
+    @property
+    def long_text_signature(self) -> str:
+        """긴 텍스트 처리 설정 식별자 (truncate 모드는 빈 문자열)"""
+        if not self.chunking:
+            return ""
+        return (
+            f"#chunk:{self.chunk_threshold}/{self.chunk_size}"
+            f"/{self.chunk_overlap}/{self.chunk_pooling}"
+        )
+    
+    @property
+    def version(self) -> str:
+        """
+        문서 벡터 버전: 모델·차원·긴 텍스트 처리 설정이 같으면 같은 텍스트에서 같은 벡터가 나옵니다.
+        재색인 시 저장된 벡터를 재사용할 수 있는지 판단하는 데 사용합니다.
+        """
+        return (
+            f"{self.model_name}@{self.dimension}"
+            f"/{self.max_length}/{self.truncation}{self.long_text_signature}"
+        )
+    
+    def _uses_process_executor(self) -> bool:
+        return self.executor_type == "process" and not _in_worker_process
+    
+    def _pretrained_kwargs(self) -> dict:
+        """from_pretrained 공통 인자: 로컬 캐시 전용 로드와 캐시 디렉토리"""
+        kwargs: dict = {"local_files_only": settings.embedding_local_files_only}
+        if settings.embedding_model_cache_dir:
+            kwargs["cache_dir"] = settings.embedding_model_cache_dir
+        return kwargs
+    
+    @property
+    def status(self) -> str:
+        if self.ready:
+            return "ready"
+        return "failed" if self.load_error else "loading"
+    
+    def load(self) -> None:
+        """
+        토크나이저·모델 로드와 워밍업 추론을 수행합니다. (스레드 안전, 한 번만 실행)
+        단계별 소요 시간은 load_timings에 기록됩니다.
+        공유 워커(EMBEDDING_WORKER_SOCKET) 모드에서는 호출할 수 없으므로 동기 encode_*도 실패합니다.
+        """
+        if self.remote is not None:
+            # 공유 워커 모드에서 동기 API가 몰래 프로세스 내 모델을 로드하지 않도록 막습니다
+            raise RuntimeError(
+                "In-process embedding is disabled while EMBEDDING_WORKER_SOCKET is set; "
+                "use the async encode methods"
+            )
+        with self._load_lock:
+            if self.ready:
+                return
+            started = time.perf_counter()
+            timings: dict[str, float] = {}
+            
+            with phase_timer(timings, "import"):
+                import transformers  # 이후 단계와 분리해 import 시간만 측정
+            
+            # 토크나이저는 배치 토큰 예산 계산과 청크 분할을 위해 항상 로드합니다
+            with phase_timer(timings, "tokenizer"):
+                self._load_tokenizer()
+            
+            # 프로세스 실행기 사용 시 모델은 워커 프로세스에서 로드합니다
+            if self._uses_process_executor():
+                print(f"📦 Embedding model will be loaded in {self.max_workers} worker process(es)")
+                with phase_timer(timings, "workers"):
+                    self._warm_up_workers()
+            else:
+                with phase_timer(timings, "model"):
+                    self._load_model()
+                if settings.embedding_warmup:
+                    with phase_timer(timings, "warmup"):
+                        self._encode(["warm-up"])
+            
+            timings["total"] = round(time.perf_counter() - started, 3)
+            self.load_timings = timings
+            self.load_error = None
+            self.ready = True
+            print(f"✅ Embedding service ready in {timings['total']:.2f}s {timings}")
+    
+    def _load_tokenizer(self) -> None:
+        if self.tokenizer is None:
+            from transformers import AutoTokenizer
+            
+            self.tokenizer = AutoTokenizer.from_pretrained(
+                self.model_name, **self._pretrained_kwargs()
+            )
+    
+    def _load_model(self) -> None:
+        """설정된 추론 백엔드로 모델을 로드합니다."""
+        from app.services.embedding_backends import create_backend
         
         print(f"📦 Loading embedding model: {self.model_name}")
-        print(f"   Device: {self.device} | Dimension: {self.dimension}")
+        print(
+            f"   Device: {self.device} | Dimension: {self.dimension} "
+            f"| Backend: {settings.embedding_backend}"
+        )
         
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModel.from_pretrained(self.model_name).to(self.device)
-        self.model.eval()
+        self.backend = create_backend(
+            settings.embedding_backend,
+            self.model_name,
+            self.device,
+            onnx_path=settings.embedding_onnx_path,
+            **self._pretrained_kwargs(),
+        )
         
         print("✅ Embedding model loaded successfully")
     
+    def _load_in_worker(self) -> None:
+        """
+        프로세스 실행기 워커용 로드: 토크나이저와 모델만 로드합니다.
+        (_load_lock·워커 풀·캐시를 거치지 않으며, 워밍업은 부모의 _warm_up_workers가 수행)
+        """
+        self._load_tokenizer()
+        self._load_model()
+        self.ready = True
+    
+    def _warm_up_workers(self) -> None:
+        """
+        워커 프로세스를 모두 띄워 모델 로드를 미리 끝냅니다.
+        EMBEDDING_WARMUP이 켜져 있으면 프로세스 내 실행과 같이 워밍업 추론도 수행합니다.
+        """
+        executor = self._get_executor()
+        if settings.embedding_warmup:
+            futures = [
+                executor.submit(_worker_encode, ["warm-up"]) for _ in range(self.max_workers)
+            ]
+        else:
+            futures = [executor.submit(_worker_ready) for _ in range(self.max_workers)]
+        wait(futures)
+        for future in futures:
+            future.result()
+    
+    def start_loading(self) -> asyncio.Future:
+        """백그라운드 스레드에서 load()를 시작합니다. (진행 중이면 같은 작업을 반환, 실패했으면 재시도)"""
+        if self._load_future is None or (self._load_future.done() and not self.ready):
+            if self.remote is not None:
+                self._load_future = asyncio.ensure_future(self._connect_worker())
+            else:
+                loop = asyncio.get_running_loop()
+                self._load_future = loop.run_in_executor(None, self.load)
+            self._load_future.add_done_callback(self._on_load_done)
+        return self._load_future
+    
+    async def _connect_worker(self) -> None:
+        """공유 임베딩 워커가 응답할 때까지 연결을 재시도합니다. (워커가 늦게 떠도 기동 가능)"""
+        started = time.perf_counter()
+        waiting = False
+        while True:
+            try:
+                dimension = await self.remote.ping()
+                break
+            except (ConnectionError, FileNotFoundError, asyncio.TimeoutError):
+                if not waiting:
+                    print(f"⏳ Waiting for embedding worker at {self.remote.path}")
+                    waiting = True
+                await asyncio.sleep(1.0)
+        
+        if dimension != self.dimension:
+            raise RuntimeError(
+                f"Embedding worker dimension ({dimension}) does not match "
+                f"EMBEDDING_DIMENSION ({self.dimension})"
+            )
+        self.load_timings = {"worker_connect": round(time.perf_counter() - started, 3)}
+        if self.chunking:
+            # 청크 분할은 호출 측에서 하므로 토크나이저만 로드합니다
+            with phase_timer(self.load_timings, "tokenizer"):
+                await asyncio.to_thread(self._load_tokenizer)
+        self.load_error = None
+        self.ready = True
+        print(f"✅ Connected to embedding worker at {self.remote.path}")
+    
+    def _on_load_done(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if (error := future.exception()) is not None:
+            self.load_error = repr(error)
+            print(f"❌ Embedding model failed to load: {error!r}")
+    
+    async def wait_until_ready(self) -> None:
+        """
+        모델 로드가 끝날 때까지 기다립니다. (아직 시작하지 않았으면 시작)
+        공유 워커 모드에서는 워커가 뜨지 않은 채 무한정 기다리지 않도록 워커 타임아웃까지만
+        기다립니다. (연결 재시도는 백그라운드에서 계속)
+        """
+        if self.ready:
+            return
+        loading = asyncio.shield(self.start_loading())
+        if self.remote is None:
+            await loading
+            return
+        try:
+            await asyncio.wait_for(loading, self.remote.timeout)
+        except TimeoutError:
+            raise ConnectionError(
+                f"Embedding worker at {self.remote.path} is not available "
+                f"(waited {self.remote.timeout}s)"
+            ) from None
+    
     def _get_instruct(self, task: str, text: str) -> str:
         """Instruction-aware 포맷: 태스크 설명 + 쿼리"""
         return f"Instruct: {task}\nQuery: {text}"
@@ -47,56 +480,369 @@ class EmbeddingService:
         도서 감상평을 임베딩 벡터로 변환합니다.
         - 쿼리(추천 요청) 시: instruction 포함
         """
-        task = (
-            "Given a book review, r etrieve books with similar themes, "
-            "emotions, and reading experience"
-        )
-        instructed_text = self._get_instruct(task, review)
-        return self._encode([instructed_text])[0]
+        return self._encode_cached(REVIEW_TASK, review)
     
     def encode_document(self, text: str) -> list[float]:
         """
         도서 정보(제목+저자+감상평)를 임베딩 벡터로 변환합니다.
         - 문서 저장 시: instruction 없이 인코딩
         """
-        return self._encode([text])[0]
+        return self._encode_cached(None, text)
     
     def encode_batch(self, texts: list[str], is_query: bool = False) -> list[list[float]]:
         """배치 임베딩"""
-        if is_query:
-            task = (
-                "Given a book review, retrieve books with similar themes, "
-                "emotions, and reading experience"
+        inputs, groups = self._expand(REVIEW_TASK if is_query else None, texts)
+        return self._combine(self._encode(inputs), groups)
+    
+    def _encode_cached(self, task: str | None, text: str) -> list[float]:
+        key = self.cache.make_key(task, text) if self.cache and task else None
+        if key and (cached := self.cache.get(key)) is not None:
+            return cached
+        
+        inputs, groups = self._expand(task, [text])
+        embedding = self._combine(self._encode(inputs), groups)[0]
+        if key:
+            self.cache.put(key, embedding)
+        return embedding
+    
+    # ── 비동기 API ──
+    
+    async def encode_review_async(self, review: str) -> list[float]:
+        """encode_review를 추론 실행기에서 실행합니다. (이벤트 루프 비차단)"""
+        return await self._encode_cached_async(REVIEW_TASK, review)
+    
+    async def encode_document_async(self, text: str) -> list[float]:
+        """encode_document를 추론 실행기에서 실행합니다. (이벤트 루프 비차단)"""
+        return await self._encode_cached_async(None, text)
+    
+    async def encode_reviews_async(self, reviews: list[str]) -> list[list[float]]:
+        """
+        여러 감상평 쿼리를 임베딩합니다. (encode_review_async와 같은 캐시·동시 요청 합치기 적용)
+        캐시에 없고 진행 중이지도 않은 감상평만 모아 한 번의 배치로 추론합니다.
+        """
+        if self.cache is None:
+            return await self.encode_batch_async(reviews, is_query=True)
+        
+        keys = [self.cache.make_key(REVIEW_TASK, review) for review in reviews]
+        found: dict[str, list[float] | asyncio.Future] = {}
+        missing: dict[str, str] = {}
+        for key, review in zip(keys, reviews):
+            if key in found or key in missing:
+                continue
+            if (cached := await self._cache_get(key)) is not None:
+                found[key] = cached
+            elif (pending := self._inflight.get(key)) is not None:
+                found[key] = pending
+            else:
+                missing[key] = review
+        
+        if missing:
+            batch = asyncio.ensure_future(
+                self._encode_queries(list(missing), list(missing.values()))
+            )
+            for i, key in enumerate(missing):
+                found[key] = self._track_inflight(key, _pick(batch, i))
+        
+        results = []
+        for key in keys:
+            value = found[key]
+            if isinstance(value, asyncio.Future):
+                value = await asyncio.shield(value)
+            results.append(value)
+        return results
+    
+    async def encode_batch_async(
+        self, texts: list[str], is_query: bool = False
+    ) -> list[list[float]]:
+        """encode_batch를 추론 실행기에서 실행합니다. (이벤트 루프 비차단)"""
+        await self.wait_until_ready()
+        inputs, groups = self._expand(REVIEW_TASK if is_query else None, texts)
+        with EMBEDDING_IN_FLIGHT.track_inprogress():
+            return self._combine(await self._run_encode(inputs), groups)
+    
+    async def _encode_cached_async(self, task: str | None, text: str) -> list[float]:
+        key = self.cache.make_key(task, text) if self.cache and task else None
+        if key is None:
+            return await self._encode_one(task, text)
+        if (cached := await self._cache_get(key)) is not None:
+            return cached
+        
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = self._track_inflight(key, _pick(self._encode_queries([key], [text], task), 0))
+        return await asyncio.shield(pending)
+    
+    async def _encode_queries(
+        self, keys: list[str], texts: list[str], task: str = REVIEW_TASK
+    ) -> list[list[float]]:
+        """캐시에 없는 쿼리를 추론해 캐시에 저장합니다. (한 개면 마이크로 배처, 여러 개면 한 배치)"""
+        if len(texts) == 1:
+            embeddings = [await self._encode_one(task, texts[0])]
+        else:
+            embeddings = await self.encode_batch_async(texts, is_query=True)
+        for key, embedding in zip(keys, embeddings):
+            self.cache.put(key, embedding)
+        return embeddings
+    
+    def _track_inflight(self, key: str, coro: Awaitable[list]) -> asyncio.Future:
+        """진행 중인 추론으로 등록하고, 끝나면 제거합니다. (실패는 기다리던 호출자마다 전달)"""
+        future = asyncio.ensure_future(coro)
+        self._inflight[key] = future
+        
+        def done(_: asyncio.Future) -> None:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if not future.cancelled():
+                future.exception()  # 기다리는 호출자가 없어도 경고를 남기지 않도록 조회
+        
+        future.add_done_callback(done)
+        return future
+    
+    async def _encode_one(self, task: str | None, text: str) -> list[float]:
+        # 캐시 적중은 모델 로드 중에도 응답하고, 추론이 필요할 때만 로드 완료를 기다립니다
+        await self.wait_until_ready()
+        inputs, groups = self._expand(task, [text])
+        with EMBEDDING_IN_FLIGHT.track_inprogress():
+            # 청크는 각각 마이크로 배처에 들어가 다른 요청과 섞여 처리됩니다
+            vectors = await asyncio.gather(*(self._submit(chunk) for chunk in inputs))
+        return self._combine(list(vectors), groups)[0]
+    
+    # ── 긴 텍스트 청크 분할 ──
+    
+    def _expand(
+        self, task: str | None, texts: list[str]
+    ) -> tuple[list[str], list[list[int]]]:
+        """
+        텍스트마다 청크로 나누고 instruction을 붙인 모델 입력 목록을 만듭니다.
+        groups[i]는 texts[i]에 속한 청크들의 토큰 수입니다. (입력 목록에서 연속된 구간)
+        """
+        inputs: list[str] = []
+        groups: list[list[int]] = []
+        for text in texts:
+            chunks = self._split_chunks(text)
+            inputs.extend(self._get_instruct(task, chunk) if task else chunk for chunk, _ in chunks)
+            groups.append([n_tokens for _, n_tokens in chunks])
+        return inputs, groups
+    
+    def _combine(
+        self, vectors: list[list[float]], groups: list[list[int]]
+    ) -> list[list[float]]:
+        """_expand로 나눈 청크 벡터를 텍스트별 하나의 정규화 벡터로 결합합니다."""
+        embeddings: list[list[float]] = []
+        start = 0
+        for weights in groups:
+            end = start + len(weights)
+            if len(weights) == 1:
+                embeddings.append(vectors[start])
+            else:
+                embeddings.append(_pool_chunks(vectors[start:end], weights, self.chunk_pooling))
+            start = end
+        return embeddings
+    
+    def _split_chunks(self, text: str) -> list[tuple[str, int]]:
+        """
+        chunk 모드에서 임계치를 넘는 텍스트를 chunk_size 토큰씩 chunk_overlap만큼 겹쳐 나눕니다.
+        전체 길이는 max_length까지 truncation 전략으로 먼저 제한하므로 청크 수에도 상한이 있습니다.
+        반환값: (청크 텍스트, 토큰 수) 목록 — 나누지 않으면 원문 하나 (토큰 수 1)
+        """
+        if not self.chunking or len(text.encode("utf-8")) <= self.chunk_threshold:
+            # 바이트 단위 BPE에서 토큰 하나는 최소 1바이트이므로 토큰화할 필요가 없습니다
+            return [(text, 1)]
+        if self.tokenizer is None:
+            self.load()
+        
+        text = self._truncate_text(text)
+        offsets = self.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True
+        )["offset_mapping"]
+        n = len(offsets)
+        if n <= self.chunk_threshold:
+            return [(text, 1)]
+        
+        # 마지막 청크가 항상 끝까지 닿도록 시작 위치는 n - overlap 전까지만 둡니다
+        chunks = []
+        step = self.chunk_size - self.chunk_overlap
+        for start in range(0, n - self.chunk_overlap, step):
+            end = min(start + self.chunk_size, n)
+            chunks.append((text[offsets[start][0] : offsets[end - 1][1]], end - start))
+        return chunks
+    
+    async def _cache_get(self, key: str) -> list[float] | None:
+        """메모리 캐시는 바로 조회하고, 디스크 조회만 스레드에서 실행합니다."""
+        if (cached := self.cache.get_cached(key)) is not None:
+            return cached
+        if self.cache.persistent:
+            return await asyncio.to_thread(self.cache.get, key)
+        return self.cache.get(key)
+    
+    def _get_executor(self) -> Executor:
+        """설정에 맞는 추론 실행기를 지연 생성합니다."""
+        if self._executor is None:
+            if self._uses_process_executor():
+                # fork는 load()가 잡고 있는 _load_lock과 부모의 서비스 상태를 그대로 물려주므로
+                # 깨끗한 인터프리터에서 시작하는 spawn으로 워커를 띄웁니다
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker_process,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="embedding",
+                )
+        return self._executor
+    
+    async def _submit(self, text: str) -> list[float]:
+        """단건 요청: 마이크로 배칭이 켜져 있으면 동시 요청과 함께 처리합니다."""
+        if self.remote is not None:
+            # 공유 워커가 모든 API 워커의 요청을 모아 배칭합니다
+            with EMBEDDING_STAGE_DURATION.labels(stage="worker").time():
+                return (await self.remote.encode([text]))[0]
+        if not settings.embedding_batching_enabled:
+            return (await self._run_encode([text]))[0]
+        
+        # 배치 스케줄러는 생성된 이벤트 루프에 묶이므로 루프가 바뀌면 새로 만듭니다
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher_loop is not loop:
+            self._batcher = _MicroBatcher(
+                run_batch=self._run_encode,
+                max_batch_size=settings.embedding_batch_max_size,
+                max_wait_ms=settings.embedding_batch_max_wait_ms,
+                max_concurrent_batches=self.max_workers,
             )
-            texts = [self._get_instruct(task, t) for t in texts]
-        return self._encode(texts)
+            self._batcher_loop = loop
+        return await self._batcher.submit(text)
+    
+    async def _run_encode(self, texts: list[str]) -> list[list[float]]:
+        """
+        _encode를 이벤트 루프 밖(스레드/프로세스)에서 실행합니다.
+        executor 단계 시간은 실행기 대기 시간을 포함합니다. (프로세스 실행기에서는
+        tokenize/forward/pooling 단계가 워커 프로세스에 기록되므로 이 값만 보입니다)
+        """
+        if self.remote is not None:
+            with EMBEDDING_STAGE_DURATION.labels(stage="worker").time():
+                return await self.remote.encode(texts, batch=True)
+        
+        loop = asyncio.get_running_loop()
+        with EMBEDDING_STAGE_DURATION.labels(stage="executor").time():
+            if self._uses_process_executor():
+                return await loop.run_in_executor(self._get_executor(), _worker_encode, texts)
+            return await loop.run_in_executor(self._get_executor(), self._encode, texts)
+    
+    def shutdown(self) -> None:
+        """추론 실행기, 워커 연결과 캐시 저장소를 종료합니다."""
+        if self.remote is not None:
+            self.remote.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.cache is not None:
+            self.cache.close()
     
     def _encode(self, texts: list[str]) -> list[list[float]]:
-        """내부 인코딩 로직"""
-        batch_dict = self.tokenizer(
+        """
+        내부 인코딩 로직
+        토큰 길이순으로 정렬해 토큰 예산 내의 배치로 나눠 추론한 뒤 원래 순서로 되돌립니다.
+        (긴 텍스트 하나 때문에 배치 전체가 같은 길이로 패딩되는 것을 방지)
+        """
+        if self.backend is None:
+            self.load()
+        
+        with EMBEDDING_STAGE_DURATION.labels(stage="tokenize").time():
+            input_ids = self._tokenize(texts)
+        for ids in input_ids:
+            EMBEDDING_TEXT_TOKENS.observe(len(ids))
+        
+        embeddings: list[list[float]] = [[] for _ in texts]
+        for bucket in _length_buckets(
+            [len(ids) for ids in input_ids], settings.embedding_batch_max_tokens
+        ):
+            vectors = self._forward([input_ids[i] for i in bucket])
+            for i, vector in zip(bucket, vectors):
+                embeddings[i] = vector
+        return embeddings
+    
+    def _tokenize(self, texts: list[str]) -> list[list[int]]:
+        """최대 길이를 넘는 텍스트는 truncation 전략에 따라 잘라낸 뒤 토큰화합니다."""
+        texts = [self._truncate_text(text) for text in texts]
+        return self.tokenizer(
             texts,
-            max_length=8192,
-            padding=True,
+            max_length=self.max_length,
             truncation=True,
-            return_tensors="pt",
-            pad_to_multiple_of=8,
-        ).to(self.device)
-        
-        with torch.no_grad():
-            outputs = self.model(**batch_dict)
+        )["input_ids"]
+    
+    def _truncate_text(self, text: str) -> str:
+        """
+        텍스트를 max_length 토큰에 맞게 잘라냅니다.
+        - head: 앞부분 유지
+        - tail: 뒷부분 유지
+        - head_tail: 앞 1/4 + 뒤 3/4 유지 (instruction과 감상평의 결론을 함께 보존)
+        """
+        budget = self.max_length - self.tokenizer.num_special_tokens_to_add()
+        if len(text.encode("utf-8")) <= budget:
+            # 바이트 단위 BPE에서 토큰 하나는 최소 1바이트이므로 토큰화할 필요가 없습니다
+            return text
         
-        embeddings = _last_token_pool(
-            outputs.last_hidden_state, batch_dict["attention_mask"]
-        )
+        offsets = self.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True
+        )["offset_mapping"]
+        if len(offsets) <= budget:
+            return text
         
-        # MRL: 지정된 차원으로 잘라내기
-        if self.dimension < embeddings.shape[-1]:
-            embeddings = embeddings[:, : self.dimension]
+        if self.truncation == "head":
+            return text[: offsets[budget - 1][1]]
+        if self.truncation == "tail":
+            return text[offsets[-budget][0]:]
         
-        # L2 정규화
-        embeddings = F.normalize(embeddings, p=2, dim=1)
+        # 구분자 토큰 몫으로 한 토큰을 남겨둡니다
+        head = max(1, int((budget - 1) * _HEAD_TAIL_HEAD_RATIO))
+        tail = budget - 1 - head
+        return text[: offsets[head - 1][1]] + "\n" + text[offsets[-tail][0]:]
+    
+    def _forward(self, input_ids: list[list[int]]) -> list[list[float]]:
+        """토큰화된 배치 하나에 대한 forward pass + 풀링 + MRL + 정규화"""
+        batch_dict = self.tokenizer.pad(
+            {"input_ids": input_ids},
+            padding=True,
+            return_tensors="pt",
+            pad_to_multiple_of=8,
+        ).to(self.device)
+        EMBEDDING_BATCH_SIZE.observe(len(input_ids))
+        EMBEDDING_BATCH_TOKENS.observe(batch_dict["input_ids"].numel())
         
-        return embeddings.cpu().tolist()
+        with EMBEDDING_STAGE_DURATION.labels(stage="forward").time():
+            last_hidden_state = self.backend.forward(batch_dict)
+        # .tolist()가 GPU 동기화를 포함하므로 CUDA에서는 forward 시간 일부가 pooling에 잡힙니다
+        with EMBEDDING_STAGE_DURATION.labels(stage="pooling").time():
+            return _pool_and_normalize(
+                last_hidden_state, batch_dict["attention_mask"], self.dimension
+            ).tolist()
+
+
+async def _pick(future: Awaitable[list], index: int):
+    """배치 결과 중 index번째 항목 (배치 하나를 여러 캐시 키가 공유할 때 사용)"""
+    return (await asyncio.shield(future))[index]
+
+
+# ── 프로세스 실행기 워커 ──
+
+def _init_worker_process() -> None:
+    """워커 프로세스 초기화: 프로세스마다 모델을 한 번만 로드합니다."""
+    global _in_worker_process
+    _in_worker_process = True
+    import torch
+    
+    torch.set_num_threads(max(1, torch.get_num_threads() // settings.embedding_max_workers))
+    get_embedding_service()._load_in_worker()
+
+
+def _worker_encode(texts: list[str]) -> list[list[float]]:
+    return get_embedding_service()._encode(texts)
+
+
+def _worker_ready() -> None:
+    """워커 초기화(모델 로드)만 끝났는지 확인합니다. (워밍업 추론 없음)"""
 
 
 # ── 싱글톤 인스턴스 ──
@@ -0,0 +1,158 @@
+from pathlib import Path
+import torch
+from torch import Tensor
+from transformers import AutoModel
+
+# 이 모듈은 torch/transformers를 import하므로 embedding 서비스가 모델 로드 시점에만 불러옵니다
+
+
+def _load_pretrained(model_name: str, **pretrained_kwargs):
+    """safetensors 가중치를 메모리 맵으로 로드합니다. (pickle 역직렬화·전체 복사 생략)"""
+    return AutoModel.from_pretrained(model_name, use_safetensors=True, **pretrained_kwargs)
+
+
+class TorchBackend:
+    """기본 추론 백엔드: fp32 eager PyTorch"""
+    
+    name = "torch"
+    
+    def __init__(self, model_name: str, device: str, **pretrained_kwargs):
+        self.model_name = model_name
+        self.device = device
+        self.model = _load_pretrained(model_name, **pretrained_kwargs).to(device)
+        self.model.eval()
+    
+    def forward(self, batch_dict: dict[str, Tensor]) -> Tensor:
+        """토큰화된 배치를 받아 last_hidden_state(float32)를 반환합니다."""
+        with torch.inference_mode():
+            return self.model(**batch_dict).last_hidden_state.float()
+
+
+class TorchInt8Backend(TorchBackend):
+    """Linear 레이어 동적 int8 양자화 (CPU 전용)"""
+    
+    name = "torch_int8"
+    
+    def __init__(self, model_name: str, device: str, **pretrained_kwargs):
+        if device != "cpu":
+            raise ValueError("torch_int8 백엔드는 EMBEDDING_DEVICE=cpu에서만 사용할 수 있습니다.")
+        super().__init__(model_name, device, **pretrained_kwargs)
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+class Bf16Backend(TorchBackend):
+    """bf16 autocast + inference_mode"""
+    
+    name = "bf16"
+    
+    def forward(self, batch_dict: dict[str, Tensor]) -> Tensor:
+        device_type = "cuda" if self.device.startswith("cuda") else "cpu"
+        with torch.inference_mode(), torch.autocast(device_type, dtype=torch.bfloat16):
+            return self.model(**batch_dict).last_hidden_state.float()
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime 백엔드
+    - 최초 실행 시 모델을 ONNX로 내보내 onnx_path에 저장하고 이후에는 재사용합니다.
+    - 추론에는 onnxruntime, 최초 내보내기에는 onnx 패키지가 필요합니다.
+      (TorchScript 기반 내보내기를 사용하므로 onnxscript는 필요 없습니다)
+    """
+    
+    name = "onnx"
+    
+    def __init__(self, model_name: str, device: str, onnx_path: str, **pretrained_kwargs):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(
+                "onnx 백엔드를 사용하려면 onnxruntime 패키지를 설치해 주세요."
+            ) from e
+        
+        self.model_name = model_name
+        self.device = device
+        path = Path(onnx_path)
+        if not path.exists():
+            try:
+                import onnx  # torch.onnx.export가 내부에서 사용
+            except ImportError as e:
+                raise RuntimeError(
+                    f"{path}에 내보낸 모델이 없습니다. ONNX로 내보내려면 onnx 패키지를 설치해 주세요."
+                ) from e
+            self._export(model_name, path, **pretrained_kwargs)
+        
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda"):
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = ort.InferenceSession(str(path), providers=providers)
+    
+    @staticmethod
+    def _export(model_name: str, path: Path, **pretrained_kwargs) -> None:
+        print(f"📦 Exporting {model_name} to ONNX: {path}")
+        model = _load_pretrained(model_name, **pretrained_kwargs)
+        model.config.use_cache = False
+        model.eval()
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        dummy = {
+            "input_ids": torch.ones(1, 8, dtype=torch.long),
+            "attention_mask": torch.ones(1, 8, dtype=torch.long),
+        }
+        dynamic_axes = {0: "batch", 1: "sequence"}
+        with torch.inference_mode():
+            torch.onnx.export(
+                model,
+                (),
+                str(path),
+                kwargs=dummy,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": dynamic_axes,
+                    "attention_mask": dynamic_axes,
+                    "last_hidden_state": dynamic_axes,
+                },
+                opset_version=17,
+                # TorchScript 기반 내보내기 (기본값인 dynamo 내보내기는 onnx·onnxscript가 추가로 필요)
+                dynamo=False,
+            )
+    
+    def forward(self, batch_dict: dict[str, Tensor]) -> Tensor:
+        outputs = self.session.run(
+            ["last_hidden_state"],
+            {
+                "input_ids": batch_dict["input_ids"].cpu().numpy(),
+                "attention_mask": batch_dict["attention_mask"].cpu().numpy(),
+            },
+        )
+        return torch.from_numpy(outputs[0]).float()
+
+
+BACKENDS = {
+    "torch": TorchBackend,
+    "torch_int8": TorchInt8Backend,
+    "bf16": Bf16Backend,
+    "onnx": OnnxBackend,
+}
+
+
+def create_backend(
+    name: str,
+    model_name: str,
+    device: str,
+    onnx_path: str = "",
+    **pretrained_kwargs,
+) -> TorchBackend | OnnxBackend:
+    """
+    설정 이름으로 추론 백엔드를 생성합니다.
+    pretrained_kwargs는 from_pretrained에 그대로 전달됩니다. (local_files_only, cache_dir 등)
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"알 수 없는 임베딩 백엔드: {name} (가능한 값: {', '.join(BACKENDS)})"
+        )
+    if name == "onnx":
+        return OnnxBackend(model_name, device, onnx_path, **pretrained_kwargs)
+    return BACKENDS[name](model_name, device, **pretrained_kwargs)
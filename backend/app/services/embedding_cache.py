@@ -0,0 +1,164 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용 정규화: 유니코드 NFC + 공백 정리 (모델 입력에는 원문을 그대로 사용)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    임베딩 결과 캐시 (LRU)
+    - 키: instruction + 정규화된 텍스트 + 모델명 + 임베딩 차원의 SHA-256
+    - 메모리: 최대 max_size개, 초과 시 가장 오래 사용하지 않은 항목부터 제거
+    - 디스크(선택): SQLite에 벡터를 저장해 재시작 후에도 캐시를 유지
+      (쓰기는 전용 스레드가 자체 연결로 모아서 기록하고, 조회는 별도 읽기 연결을 사용합니다.
+       _lock은 메모리 LRU만 보호하므로 메모리 조회와 put은 디스크 I/O를 기다리지 않습니다)
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        dimension: int,
+        max_size: int = 4096,
+        path: str = "",
+    ):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()      # 메모리 LRU와 통계
+        self._db_lock = threading.Lock()   # 읽기 연결
+        self._db: sqlite3.Connection | None = None
+        self._writes: queue.Queue[tuple[str, bytes] | None] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL: 쓰기 스레드의 커밋 중에도 읽기 연결이 막히지 않습니다
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                args=(path,),
+                name="embedding-cache-writer",
+                daemon=True,
+            )
+            self._writer.start()
+    
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+    
+    def make_key(self, instruction: str | None, text: str) -> str:
+        raw = "\x1f".join(
+            [self.model_name, str(self.dimension), instruction or "", normalize_text(text)]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get_cached(self, key: str) -> list[float] | None:
+        """메모리만 조회합니다. (미스는 세지 않으므로 이어서 get으로 디스크를 조회)"""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return embedding
+    
+    def get(self, key: str) -> list[float] | None:
+        """메모리 → 디스크 순으로 조회합니다. (디스크 조회는 블로킹이므로 이벤트 루프 밖에서 호출)"""
+        if (embedding := self.get_cached(key)) is not None:
+            return embedding
+        
+        row = None
+        with self._db_lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+        
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        embedding = array("f", row[0]).tolist()
+        with self._lock:
+            self._remember(key, embedding)
+            self.hits += 1
+            return embedding
+    
+    def put(self, key: str, embedding: list[float]) -> None:
+        with self._lock:
+            self._remember(key, embedding)
+        if self._writer is not None:
+            self._writes.put((key, array("f", embedding).tobytes()))
+    
+    def _write_loop(self, path: str) -> None:
+        """대기 중인 쓰기를 모두 모아 한 번에 커밋합니다. (None을 받으면 종료, 연결은 이 스레드 전용)"""
+        db = sqlite3.connect(path)
+        try:
+            self._drain_writes(db)
+        finally:
+            db.close()
+    
+    def _drain_writes(self, db: sqlite3.Connection) -> None:
+        while True:
+            item = self._writes.get()
+            rows = []
+            while item is not None:
+                rows.append(item)
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+                )
+                db.commit()
+            if item is None:
+                return
+    
+    def _remember(self, key: str, embedding: list[float]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "persistent": self._db is not None,
+        }
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            # 남은 쓰기를 기록한 뒤 종료합니다
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import os
+import struct
+import numpy as np
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# ── 프로토콜 ──
+# 요청: [request_id u32][op u8][count u32] + count × ([length u32][UTF-8 텍스트])
+# 응답: [request_id u32][status u8][length u32] + payload
+#   성공 payload: [count u32][dim u32] + count × dim float32 (리틀 엔디언)
+#   실패 payload: UTF-8 오류 메시지
+# 한 연결에서 여러 요청을 동시에 보낼 수 있고 응답은 완료 순서대로 돌아옵니다.
+REQUEST_HEADER = struct.Struct("<IBI")
+RESPONSE_HEADER = struct.Struct("<IBI")
+LENGTH = struct.Struct("<I")
+VECTORS_HEADER = struct.Struct("<II")
+
+OP_PING = 0          # 응답: 벡터 0개 + 모델 차원
+OP_ENCODE = 1        # 텍스트마다 마이크로 배칭 (여러 API 워커의 단건 요청을 한 배치로)
+OP_ENCODE_BATCH = 2  # 전체를 한 번의 배치 추론으로 (일괄 등록용)
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+def pack_texts(request_id: int, op: int, texts: list[str]) -> bytes:
+    parts = [REQUEST_HEADER.pack(request_id, op, len(texts))]
+    for text in texts:
+        data = text.encode("utf-8")
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def pack_vectors(vectors: list[list[float]], dimension: int) -> bytes:
+    array = np.asarray(vectors, dtype="<f4").reshape(len(vectors), dimension)
+    return VECTORS_HEADER.pack(len(vectors), dimension) + array.tobytes()
+
+
+def unpack_vectors(payload: bytes) -> tuple[np.ndarray, int]:
+    count, dimension = VECTORS_HEADER.unpack_from(payload)
+    array = np.frombuffer(payload, dtype="<f4", offset=VECTORS_HEADER.size)
+    return array.reshape(count, dimension), dimension
+
+
+class EmbeddingWorkerClient:
+    """
+    임베딩 워커 프로세스 클라이언트 (API 워커마다 하나)
+    - 이벤트 루프마다 Unix 소켓 연결 하나를 열어 요청을 다중화합니다.
+    - 연결이 끊기면 대기 중인 요청을 실패 처리하고 다음 요청에서 다시 연결합니다.
+    - 배치 요청은 batch_size개씩 나눠 차례로 보내므로 타임아웃은 배치 하나에 적용됩니다.
+    """
+    
+    def __init__(self, path: str, timeout: float, batch_size: int = 32):
+        self.path = path
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self._writer: asyncio.StreamWriter | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connect_lock: asyncio.Lock | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._next_id = 0
+    
+    async def ping(self) -> int:
+        """워커가 응답하면 모델 차원을 반환합니다."""
+        _, dimension = unpack_vectors(await self._request(OP_PING, []))
+        return dimension
+    
+    async def encode(self, texts: list[str], batch: bool = False) -> list[list[float]]:
+        """batch=False면 텍스트마다 워커의 마이크로 배칭을 거칩니다."""
+        if not batch:
+            vectors, _ = unpack_vectors(await self._request(OP_ENCODE, texts))
+            return vectors.tolist()
+        
+        # 재색인·일괄 등록처럼 큰 배치가 한 번의 타임아웃 안에 끝나야 하는 일이 없도록 나눠 보냅니다
+        results: list[list[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            payload = await self._request(OP_ENCODE_BATCH, texts[i : i + self.batch_size])
+            vectors, _ = unpack_vectors(payload)
+            results.extend(vectors.tolist())
+        return results
+    
+    async def _request(self, op: int, texts: list[str]) -> bytes:
+        """연결·전송·응답 대기 전체를 타임아웃으로 제한합니다. (워커가 뜨지 않았을 때 무한 대기 방지)"""
+        try:
+            async with asyncio.timeout(self.timeout):
+                writer, pending = await self._ensure_connected()
+                
+                request_id = self._next_id
+                self._next_id = (self._next_id + 1) % 2**32
+                future = self._loop.create_future()
+                pending[request_id] = future
+                try:
+                    writer.write(pack_texts(request_id, op, texts))
+                    await writer.drain()
+                    return await future
+                finally:
+                    pending.pop(request_id, None)
+        except TimeoutError:
+            raise TimeoutError(
+                f"Embedding worker at {self.path} did not respond within {self.timeout}s"
+            ) from None
+    
+    async def _ensure_connected(
+        self,
+    ) -> tuple[asyncio.StreamWriter, dict[int, asyncio.Future]]:
+        """현재 연결의 writer와 대기 중인 요청 맵을 반환합니다. (없으면 새로 연결)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 연결은 생성된 이벤트 루프에 묶이므로 루프가 바뀌면 새로 엽니다
+            self._connect_lock = asyncio.Lock()
+            self._writer = None
+            self._loop = loop
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer, self._pending
+        
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                # 요청 맵은 연결마다 따로 두어 끊긴 연결의 정리가 새 연결에 영향을 주지 않게 합니다
+                self._writer, self._pending = writer, {}
+                self._reader_task = asyncio.create_task(
+                    self._read_responses(reader, writer, self._pending)
+                )
+            return self._writer, self._pending
+    
+    async def _read_responses(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        pending: dict[int, asyncio.Future],
+    ) -> None:
+        """한 연결의 응답을 읽습니다. 끊기면 이 연결의 요청만 실패 처리합니다."""
+        try:
+            while True:
+                header = await reader.readexactly(RESPONSE_HEADER.size)
+                request_id, status, length = RESPONSE_HEADER.unpack(header)
+                payload = await reader.readexactly(length)
+                
+                future = pending.get(request_id)
+                if future is None or future.done():
+                    continue  # 타임아웃으로 이미 포기한 요청
+                if status == STATUS_OK:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload.decode("utf-8")))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            error = ConnectionError(f"Embedding worker connection lost: {e!r}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+
+# ── 워커 서버 ──
+
+async def _handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """API 워커 하나의 연결: 요청마다 태스크를 만들어 동시에 처리합니다."""
+    from app.services.embedding import get_embedding_service
+    
+    service = get_embedding_service()
+    write_lock = asyncio.Lock()
+    tasks: set[asyncio.Task] = set()
+    
+    async def respond(request_id: int, op: int, texts: list[str]) -> None:
+        try:
+            if op == OP_PING:
+                vectors = []
+            elif op == OP_ENCODE:
+                # 모든 연결이 같은 마이크로 배처를 공유하므로 워커 간 배칭이 됩니다
+                vectors = await asyncio.gather(*(service._submit(text) for text in texts))
+            elif op == OP_ENCODE_BATCH:
+                vectors = await service._run_encode(texts)
+            else:
+                raise ValueError(f"Unknown op: {op}")
+            status, payload = STATUS_OK, pack_vectors(vectors, service.dimension)
+        except Exception as e:
+            status, payload = STATUS_ERROR, repr(e).encode("utf-8")
+        
+        async with write_lock:
+            writer.write(RESPONSE_HEADER.pack(request_id, status, len(payload)) + payload)
+            await writer.drain()
+    
+    try:
+        while True:
+            request_id, op, count = REQUEST_HEADER.unpack(
+                await reader.readexactly(REQUEST_HEADER.size)
+            )
+            texts = []
+            for _ in range(count):
+                (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+                texts.append((await reader.readexactly(length)).decode("utf-8"))
+            
+            task = asyncio.create_task(respond(request_id, op, texts))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+
+
+async def serve(path: str) -> None:
+    """모델을 로드한 뒤 Unix 소켓에서 임베딩 요청을 받습니다."""
+    from app.services import embedding
+    
+    embedding._in_worker_server = True
+    service = embedding.get_embedding_service()
+    await service.wait_until_ready()
+    
+    if os.path.exists(path):
+        os.unlink(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    server = await asyncio.start_unix_server(_handle_connection, path=path)
+    os.chmod(path, 0o660)
+    print(f"🧠 Embedding worker listening on {path} (dim={service.dimension})")
+    
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API 워커들이 공유하는 임베딩 추론 프로세스")
+    parser.add_argument(
+        "--socket",
+        default=settings.embedding_worker_socket,
+        help="Unix 소켓 경로 (기본값: EMBEDDING_WORKER_SOCKET)",
+    )
+    args = parser.parse_args()
+    if not args.socket:
+        parser.error("--socket 또는 EMBEDDING_WORKER_SOCKET을 지정해 주세요.")
+    
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        print("👋 Embedding worker stopped")
+
+
+if __name__ == "__main__":
+    main()
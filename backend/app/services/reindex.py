@@ -0,0 +1,324 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from elasticsearch.helpers import async_streaming_bulk
+from app.core.config import get_settings
+from app.schemas.book import BookDocument
+from app.schemas.reindex import ReindexStatus
+from app.services.elasticsearch import DOC_VALUE_VECTOR_FIELDS, VECTOR_FIELDS, get_es_service
+from app.services.embedding import get_embedding_service, truncate_embedding
+
+settings = get_settings()
+
+# 재색인 시 새로 계산해 채우는 필드
+_DERIVED_FIELDS = VECTOR_FIELDS | {"content_hash", "embedding_version"}
+
+
+class ReindexJob:
+    """
+    재임베딩·재색인 작업
+    1) 현재 ES_INDEX가 가리키는 인덱스를 PIT + search_after(id 순)로 순회
+    2) index_book과 같은 방식으로 문서 텍스트를 만들고, 내용 해시와 임베딩 버전이
+       저장된 값과 같으면 기존 벡터를 재사용, 다르면 배치로 다시 임베딩
+    3) 현재 설정의 매핑으로 만든 새 버전 인덱스에 bulk로 기록 (refresh는 끝날 때 한 번)
+    4) 모두 끝나면 alias를 원자적으로 전환
+    
+    배치마다 마지막 정렬 키를 체크포인트 파일에 저장하므로 중단된 작업은 다시 실행하면
+    이어서 진행합니다. 작업 중 원본 인덱스에 들어온 쓰기는 새 인덱스에 반영되지 않을 수 있으므로
+    쓰기가 없는 시점에 실행해 주세요.
+    """
+    
+    def __init__(self, checkpoint_path: str, batch_size: int):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.batch_size = max(1, batch_size)
+        self.status = "idle"  # idle / running / completed / failed
+        self.error: str | None = None
+        self.state: dict = {}
+        self._task: asyncio.Task | None = None
+    
+    # ── 상태 ──
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def progress(self) -> ReindexStatus:
+        """진행 상황 (기동 후 실행한 적이 없어도 남은 체크포인트가 있으면 중단된 작업으로 보고)"""
+        state = self.state
+        status = self.status
+        if status == "idle" and not state:
+            state = self._load_checkpoint() or {}
+            if state:
+                status = "interrupted"
+        return ReindexStatus(status=status, error=self.error, **state)
+    
+    def _load_checkpoint(self) -> dict | None:
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+    
+    def _save_checkpoint(self) -> None:
+        """임시 파일에 쓴 뒤 교체하여 중단 시에도 체크포인트가 깨지지 않게 합니다."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    # ── 실행 ──
+    
+    def start(self, delete_old: bool = False, restart: bool = False) -> bool:
+        """백그라운드 태스크로 작업을 시작합니다. 이미 실행 중이면 False를 반환합니다."""
+        if self.running:
+            return False
+        self.status = "running"
+        self._task = asyncio.create_task(self.run(delete_old=delete_old, restart=restart))
+        self._task.add_done_callback(self._on_done)
+        return True
+    
+    def _on_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and (error := task.exception()) is not None:
+            print(f"❌ Reindex failed: {error!r}")
+    
+    def cancel(self) -> None:
+        """실행 중인 작업을 중단합니다. (체크포인트는 남아 다음 실행에서 이어집니다)"""
+        if self.running:
+            self._task.cancel()
+    
+    async def run(self, delete_old: bool = False, restart: bool = False) -> str:
+        """
+        작업을 끝까지 실행하고 새 인덱스 이름을 반환합니다.
+        restart=True면 체크포인트를 무시하고 처음부터 다시 시작합니다.
+        """
+        self.status = "running"
+        self.error = None
+        self.state = {}
+        try:
+            new_index = await self._run(delete_old, restart)
+        except asyncio.CancelledError:
+            self.status = "idle"
+            self.state = {}
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = repr(e)
+            raise
+        self.status = "completed"
+        return new_index
+    
+    async def _run(self, delete_old: bool, restart: bool) -> str:
+        es = get_es_service()
+        embedding_service = get_embedding_service()
+        await embedding_service.wait_until_ready()
+        
+        source_indices = await es._resolve_indices()
+        if not source_indices:
+            raise RuntimeError(f"Index '{es.index}' does not exist")
+        
+        checkpoint = None if restart else self._load_checkpoint()
+        if checkpoint and not await self._can_resume(checkpoint, source_indices):
+            await self._discard(checkpoint, source_indices)
+            checkpoint = None
+        elif restart and (stale := self._load_checkpoint()):
+            await self._discard(stale, source_indices)
+        
+        if checkpoint:
+            self.state = checkpoint
+            print(
+                f"♻️ Resuming reindex into '{checkpoint['target_index']}' "
+                f"({checkpoint['processed']}/{checkpoint['total']})"
+            )
+        else:
+            self.state = await self._create_target(source_indices)
+            self._save_checkpoint()
+            print(
+                f"🔄 Reindexing {self.state['total']} documents: "
+                f"{', '.join(source_indices)} → {self.state['target_index']} "
+                f"({self.state['embedding_version']})"
+            )
+        
+        await self._copy_documents(source_indices)
+        
+        target_index = self.state["target_index"]
+        await es.es.indices.put_settings(
+            index=target_index,
+            settings={"index": {"refresh_interval": settings.es_refresh_interval}},
+        )
+        await es.es.indices.refresh(index=target_index)
+        await es.switch_alias(source_indices, target_index, delete_old=delete_old)
+        
+        # 벡터가 바뀌었으므로 이웃 캐시와 로컬 벡터 저장소를 새 인덱스 기준으로 다시 채웁니다
+        if es.similar_cache is not None:
+            es.similar_cache.clear()
+        await es.sync_local_store(force=True)
+        
+        self.state["finished_at"] = datetime.now(timezone.utc).isoformat()
+        self.checkpoint_path.unlink(missing_ok=True)
+        print(
+            f"✅ Reindex completed: {self.state['processed']} documents "
+            f"({self.state['reembedded']} re-embedded, {self.state['reused']} reused)"
+        )
+        return target_index
+    
+    async def _can_resume(self, checkpoint: dict, source_indices: list[str]) -> bool:
+        """원본 인덱스와 임베딩 버전이 같고 대상 인덱스가 남아 있어야 이어서 진행합니다."""
+        return (
+            checkpoint.get("source_indices") == source_indices
+            and checkpoint.get("embedding_version") == get_embedding_service().version
+            and await get_es_service().es.indices.exists(index=checkpoint["target_index"])
+        )
+    
+    async def _discard(self, checkpoint: dict, source_indices: list[str]) -> None:
+        """이어갈 수 없는 체크포인트의 미완성 대상 인덱스를 지웁니다. (사용 중인 인덱스는 제외)"""
+        target_index = checkpoint.get("target_index")
+        es = get_es_service().es
+        if (
+            target_index
+            and target_index not in source_indices
+            and await es.indices.exists(index=target_index)
+        ):
+            await es.indices.delete(index=target_index)
+            print(f"🗑️ Incomplete reindex target deleted: {target_index}")
+        self.checkpoint_path.unlink(missing_ok=True)
+    
+    async def _create_target(self, source_indices: list[str]) -> dict:
+        """현재 설정의 매핑으로 대상 인덱스를 만듭니다. (적재 중에는 주기적 refresh를 끔)"""
+        es = get_es_service()
+        body = es._index_body()
+        body["settings"]["index"]["refresh_interval"] = "-1"
+        target_index = es._new_index_name()
+        await es.es.indices.create(index=target_index, body=body)
+        
+        total = (await es.es.count(index=",".join(source_indices)))["count"]
+        return {
+            "target_index": target_index,
+            "source_indices": source_indices,
+            "embedding_version": get_embedding_service().version,
+            "total": total,
+            "processed": 0,
+            "reembedded": 0,
+            "reused": 0,
+            "search_after": None,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+    
+    async def _copy_documents(self, source_indices: list[str]) -> None:
+        """
+        원본을 id 순으로 배치 단위로 읽어 대상 인덱스에 기록합니다.
+        PIT는 실행마다 새로 열고, 체크포인트의 search_after부터 이어서 읽습니다.
+        (id가 유일한 정렬 키이므로 PIT가 바뀌어도 중복·누락이 없습니다)
+        벡터를 _source에 저장하지 않는 인덱스는 기존 벡터를 script_fields로 doc values에서 함께 읽습니다.
+        """
+        es = get_es_service()
+        pit_id = (
+            await es.es.open_point_in_time(
+                index=",".join(source_indices), keep_alive=settings.es_pit_keep_alive
+            )
+        )["id"]
+        try:
+            while True:
+                params = {
+                    "size": self.batch_size,
+                    "sort": [{"id": {"order": "asc"}}],
+                    "pit": {"id": pit_id, "keep_alive": settings.es_pit_keep_alive},
+                    "source_excludes": ["embedding_coarse"],
+                }
+                if not settings.es_store_vectors_in_source:
+                    params["script_fields"] = DOC_VALUE_VECTOR_FIELDS
+                if self.state["search_after"]:
+                    params["search_after"] = self.state["search_after"]
+                with es._observe("reindex_scan"):
+                    result = await es.es.search(**params)
+                pit_id = result.get("pit_id", pit_id)
+                hits = result["hits"]["hits"]
+                if not hits:
+                    break
+                
+                await self._write_batch(hits)
+                
+                # 기록이 끝난 뒤에만 체크포인트를 전진시킵니다 (재개 시 최대 한 배치 재기록)
+                self.state["search_after"] = hits[-1]["sort"]
+                self.state["processed"] += len(hits)
+                self._save_checkpoint()
+                print(f"   {self.state['processed']}/{self.state['total']} documents")
+                
+                if len(hits) < self.batch_size:
+                    break
+        finally:
+            await es._close_pit(pit_id)
+    
+    async def _write_batch(self, hits: list[dict]) -> None:
+        """
+        내용 해시와 임베딩 버전이 같은 문서는 벡터를 재사용하고 나머지만 다시 임베딩합니다.
+        기존 벡터는 _source에 없으면 히트의 doc values(script_fields)에서 가져옵니다.
+        """
+        es = get_es_service()
+        embedding_service = get_embedding_service()
+        version = embedding_service.version
+        
+        sources = [hit["_source"] for hit in hits]
+        texts = [es._doc_text(s["title"], s["author"], s["review"]) for s in sources]
+        hashes = [es._content_hash(text) for text in texts]
+        vectors: list[list[float] | None] = [
+            (source.get("embedding") or es._doc_value_vector(hit))
+            if source.get("content_hash") == content_hash
+            and source.get("embedding_version") == version
+            else None
+            for hit, source, content_hash in zip(hits, sources, hashes)
+        ]
+        
+        stale = [i for i, vector in enumerate(vectors) if not vector]
+        if stale:
+            embeddings = await embedding_service.encode_batch_async([texts[i] for i in stale])
+            for i, embedding in zip(stale, embeddings):
+                vectors[i] = embedding
+        
+        actions = []
+        for source, content_hash, vector in zip(sources, hashes, vectors):
+            document = BookDocument(
+                **{k: v for k, v in source.items() if k not in _DERIVED_FIELDS},
+                embedding=vector,
+                embedding_coarse=(
+                    truncate_embedding(vector, es.coarse_dimension)
+                    if es.coarse_dimension
+                    else None
+                ),
+                content_hash=content_hash,
+                embedding_version=version,
+            )
+            actions.append(
+                {
+                    "_index": self.state["target_index"],
+                    "_id": document.id,
+                    "_source": es._to_source(document),
+                }
+            )
+        
+        with es._observe("reindex_bulk"):
+            async for ok, info in async_streaming_bulk(
+                es.es,
+                actions,
+                chunk_size=len(actions),
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                if not ok:
+                    # 체크포인트를 전진시키지 않고 중단하여 다음 실행에서 이 배치를 다시 기록합니다
+                    error = next(iter(info.values())).get("error")
+                    raise RuntimeError(f"Bulk write into reindex target failed: {error}")
+        
+        self.state["reembedded"] += len(stale)
+        self.state["reused"] += len(sources) - len(stale)
+
+
+# ── 싱글톤 인스턴스 ──
+_reindex_job: ReindexJob | None = None
+
+
+def get_reindex_job() -> ReindexJob:
+    global _reindex_job
+    if _reindex_job is None:
+        _reindex_job = ReindexJob(settings.reindex_checkpoint_path, settings.reindex_batch_size)
+    return _reindex_job
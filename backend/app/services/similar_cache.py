@@ -0,0 +1,140 @@
+import time
+from collections import Counter, OrderedDict
+from app.schemas.book import BookResponse, RecommendationResponse
+
+
+class SimilarBooksCache:
+    """
+    도서별 유사 도서(이웃) 목록 캐시
+    - 도서마다 상위 k개 이웃을 (ID, 점수)로 보관하고 도서 정보는 공유합니다.
+    - 추가 시: 새 도서의 kNN 결과를 이용해 다른 도서의 top-k에 들어가는지 증분 반영
+      (결과 밖의 도서 중 새 도서가 top-k에 들 수도 있는 목록은 버려서 다음 조회 때 재계산)
+    - 삭제 시: 모든 이웃 목록에서 제거 (꽉 차 있던 목록은 불완전으로 표시 → 다음 조회 때 재계산)
+    - 다른 워커 프로세스의 쓰기는 보이지 않으므로 ttl로 오래된 목록을 만료시킵니다.
+    """
+    
+    def __init__(self, k: int = 20, max_size: int = 10000, ttl: float = 300.0):
+        self.k = k
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        
+        # book_id → (이웃 목록[(id, score)] 점수 내림차순, 완전 여부, 저장 시각)
+        self._entries: OrderedDict[str, tuple[list[tuple[str, float]], bool, float]] = OrderedDict()
+        # 이웃으로 참조되는 도서 정보와 참조 수 (목록이 사라지면 함께 정리)
+        self._books: dict[str, BookResponse] = {}
+        self._refs: Counter[str] = Counter()
+    
+    def get(self, book_id: str, top_k: int) -> list[RecommendationResponse] | None:
+        entry = self._entries.get(book_id)
+        if entry is not None:
+            neighbors, complete, stored_at = entry
+            fresh = time.monotonic() - stored_at < self.ttl
+            if fresh and top_k <= self.k and (complete or len(neighbors) >= top_k):
+                self._entries.move_to_end(book_id)
+                self.hits += 1
+                return [
+                    RecommendationResponse(book=self._books[doc_id], score=score)
+                    for doc_id, score in neighbors[:top_k]
+                ]
+        self.misses += 1
+        return None
+    
+    def put(self, book_id: str, results: list[RecommendationResponse]) -> None:
+        """book_id의 상위 k개 이웃(자기 자신 제외)을 저장합니다."""
+        for result in results[: self.k]:
+            self._books[result.book.id] = result.book
+        self._store(
+            book_id,
+            [(result.book.id, result.score) for result in results[: self.k]],
+            complete=True,
+        )
+    
+    def on_insert(self, book: BookResponse, results: list[RecommendationResponse]) -> None:
+        """
+        새 도서가 추가되었을 때 호출합니다.
+        results: 새 도서 기준 kNN 결과 (코사인 유사도는 대칭이므로
+        결과의 각 도서 B에 대해 같은 점수로 B의 이웃 목록에 들어갈 수 있는지 확인합니다)
+        
+        결과에 없는 도서와 새 도서의 점수는 결과의 마지막 점수 이하입니다.
+        따라서 꽉 찬 목록의 최저 점수가 그 이상이면 영향이 없고, 그렇지 않은 목록은 버립니다.
+        """
+        self.put(book.id, results)
+        
+        scores = {result.book.id: result.score for result in results}
+        bound = results[-1].score if results else float("-inf")
+        for owner, (neighbors, complete, stored_at) in list(self._entries.items()):
+            if owner == book.id:
+                continue
+            score = scores.get(owner)
+            if score is None:
+                if len(neighbors) < self.k or neighbors[-1][1] < bound:
+                    self._drop(owner)
+                continue
+            if len(neighbors) >= self.k and score <= neighbors[-1][1]:
+                continue
+            self._books[book.id] = book
+            updated = sorted(neighbors + [(book.id, score)], key=lambda n: n[1], reverse=True)
+            self._set(owner, updated[: self.k], complete, stored_at)
+    
+    def on_delete(self, book_id: str) -> None:
+        """삭제된 도서를 모든 이웃 목록에서 제거합니다."""
+        self._drop(book_id)
+        
+        for owner, (neighbors, complete, stored_at) in list(self._entries.items()):
+            remaining = [n for n in neighbors if n[0] != book_id]
+            if len(remaining) != len(neighbors):
+                # 꽉 찬 목록에서 빠지면 k+1번째 이웃을 알 수 없으므로 불완전 처리
+                still_complete = complete and len(neighbors) < self.k
+                self._set(owner, remaining, still_complete, stored_at)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._books.clear()
+        self._refs.clear()
+    
+    def _store(self, book_id: str, neighbors: list[tuple[str, float]], complete: bool) -> None:
+        self._set(book_id, neighbors, complete, time.monotonic())
+        self._entries.move_to_end(book_id)
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+    
+    # ── 참조 관리 (목록이 바뀔 때마다 도서 정보 참조 수를 맞춥니다) ──
+    
+    def _set(
+        self,
+        book_id: str,
+        neighbors: list[tuple[str, float]],
+        complete: bool,
+        stored_at: float,
+    ) -> None:
+        self._refs.update(doc_id for doc_id, _ in neighbors)
+        self._release(book_id)
+        self._entries[book_id] = (neighbors, complete, stored_at)
+    
+    def _drop(self, book_id: str) -> None:
+        self._release(book_id)
+        self._entries.pop(book_id, None)
+    
+    def _release(self, book_id: str) -> None:
+        """book_id의 기존 목록이 참조하던 도서 정보의 참조 수를 줄이고, 0이 되면 지웁니다."""
+        entry = self._entries.get(book_id)
+        if entry is None:
+            return
+        for doc_id, _ in entry[0]:
+            self._refs[doc_id] -= 1
+            if self._refs[doc_id] <= 0:
+                del self._refs[doc_id]
+                self._books.pop(doc_id, None)
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "k": self.k,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
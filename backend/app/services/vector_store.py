@@ -0,0 +1,351 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from app.schemas.book import BookResponse, RecommendationResponse
+from app.schemas.recommendation import RecommendationFilter
+
+
+def _as_utc(value: datetime | str) -> datetime:
+    """저장된 문자열/naive datetime을 비교 가능한 UTC datetime으로 변환합니다."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class LocalVectorStore:
+    """
+    프로세스 내 벡터 저장소 (ES kNN 대체용)
+    - 검색은 연속된 NumPy 행렬(float32/float16) + ID 배열로 메모리에서 수행
+    - argpartition 기반 전수 비교 top-k (정확한 검색, 소·중규모 서재용)
+    - 영속화는 SQLite(WAL): 도서별 행(도서 정보 + 벡터 BLOB)과 변경 로그
+      추가/삭제는 해당 행과 로그 한 줄만 기록하는 증분 쓰기입니다.
+    - 여러 uvicorn 워커가 같은 파일을 공유합니다. 쓰기는 SQLite 잠금으로 직렬화되고,
+      각 프로세스는 검색 전에 다른 프로세스의 변경을 로그에서 읽어 메모리 행렬에 반영합니다.
+    
+    쓰기(add/add_many/delete/clear)와 catch_up의 로그 반영은 블로킹이므로 이벤트 루프 밖에서 호출하세요.
+    """
+    
+    # 변경 로그 보관 개수 (이보다 뒤처진 프로세스는 전체를 다시 읽음)
+    CHANGE_LOG_RETENTION = 10000
+    
+    def __init__(self, path: str, dimension: int, dtype: str = "float32"):
+        self.dir = Path(path)
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        
+        self.ids: list[str] = []
+        self.books: dict[str, dict] = {}
+        self._rows: dict[str, int] = {}
+        self._vectors: np.ndarray = np.zeros((0, dimension), dtype=self.dtype)
+        self._version = 0  # 메모리에 반영한 마지막 변경 로그 번호
+        
+        # 메모리 행렬은 쓰기 스레드와 이벤트 루프가 함께 접근하므로 잠금으로 보호합니다
+        self._lock = threading.Lock()
+        # 쓰기와 로그 반영을 직렬화하여 변경이 순서대로 한 번씩만 적용되게 합니다
+        self._write_lock = threading.RLock()
+        
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # 쓰기·로그 반영용(스레드)과 변경 감지용(이벤트 루프) 연결을 분리합니다
+        self._db = self._connect()
+        self._watch = self._connect()
+        self._init_schema()
+        self._data_version = self._current_data_version()
+        self._reload()
+    
+    # ── 영속화 ──
+    
+    @property
+    def _db_path(self) -> Path:
+        return self.dir / "store.db"
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _init_schema(self) -> None:
+        with self._write_lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS vectors "
+                "(id TEXT PRIMARY KEY, book TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS changes "
+                "(version INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, op TEXT NOT NULL)"
+            )
+            layout = {"dimension": str(self.dimension), "dtype": self.dtype.name}
+            stored = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+            if stored and stored != layout:
+                # 차원이나 정밀도가 바뀌었으면 기존 데이터는 사용할 수 없습니다
+                print(f"⚠️ Local vector store at {self.dir} has a different layout — starting empty")
+                self._db.execute("DELETE FROM vectors")
+                self._db.execute("INSERT INTO changes (id, op) VALUES ('', 'clear')")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", layout.items()
+            )
+    
+    def _current_data_version(self) -> int:
+        """다른 연결(다른 프로세스 포함)이 커밋하면 바뀌는 값 (공유 메모리만 읽는 가벼운 조회)"""
+        return self._watch.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _reload(self) -> None:
+        """저장된 전체 행을 읽어 메모리 행렬을 다시 만듭니다."""
+        with self._write_lock:
+            self._db.execute("BEGIN")
+            try:
+                version = self._db.execute("SELECT COALESCE(MAX(version), 0) FROM changes").fetchone()[0]
+                rows = self._db.execute("SELECT id, book, vector FROM vectors").fetchall()
+            finally:
+                self._db.execute("COMMIT")
+        
+        vectors = np.zeros((max(len(rows), 1024), self.dimension), dtype=self.dtype)
+        for row, (_, _, blob) in enumerate(rows):
+            vectors[row] = np.frombuffer(blob, dtype=self.dtype)
+        with self._lock:
+            self.ids = [doc_id for doc_id, _, _ in rows]
+            self.books = {doc_id: json.loads(book) for doc_id, book, _ in rows}
+            self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            self._vectors = vectors
+            self._version = version
+    
+    async def catch_up(self) -> None:
+        """다른 프로세스가 기록한 변경이 있으면 메모리 행렬에 반영합니다. (없으면 즉시 반환)"""
+        data_version = self._current_data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            await asyncio.to_thread(self._apply_changes)
+    
+    def _apply_changes(self) -> None:
+        """마지막으로 반영한 이후의 변경 로그를 순서대로 메모리에 적용합니다."""
+        with self._write_lock:
+            oldest = self._db.execute("SELECT MIN(version) FROM changes").fetchone()[0]
+            if oldest is not None and oldest > self._version + 1:
+                # 로그가 정리되어 중간 변경을 알 수 없으면 전체를 다시 읽습니다
+                self._reload()
+                return
+            changes = self._db.execute(
+                "SELECT c.version, c.id, c.op, v.book, v.vector FROM changes c "
+                "LEFT JOIN vectors v ON v.id = c.id WHERE c.version > ? ORDER BY c.version",
+                (self._version,),
+            ).fetchall()
+            
+            with self._lock:
+                for version, doc_id, op, book, blob in changes:
+                    if op == "clear":
+                        self._clear_memory()
+                    elif op == "upsert" and blob is not None:
+                        self._upsert_memory(
+                            doc_id, json.loads(book), np.frombuffer(blob, dtype=self.dtype)
+                        )
+                    else:
+                        # 삭제, 또는 이후에 삭제되어 행이 없는 추가
+                        self._delete_memory(doc_id)
+                    self._version = version
+    
+    def _write(self, statements: list[tuple[str, list[tuple]]]) -> None:
+        """한 트랜잭션으로 기록한 뒤 자기 변경을 메모리에 반영합니다."""
+        with self._write_lock, self._db:
+            for sql, params in statements:
+                self._db.executemany(sql, params)
+            # 오래된 로그 정리 (뒤처진 프로세스는 _apply_changes에서 전체를 다시 읽음)
+            self._db.execute(
+                "DELETE FROM changes WHERE version <= "
+                "(SELECT MAX(version) FROM changes) - ?",
+                (self.CHANGE_LOG_RETENTION,),
+            )
+        self._apply_changes()
+    
+    # ── 메모리 행렬 (self._lock 안에서 호출) ──
+    
+    def _reserve(self, count: int) -> None:
+        """행렬 용량이 부족하면 두 배로 늘립니다."""
+        capacity = self._vectors.shape[0]
+        if count <= capacity:
+            return
+        grown = np.zeros((max(count, capacity * 2, 1024), self.dimension), dtype=self.dtype)
+        grown[: len(self.ids)] = self._vectors[: len(self.ids)]
+        self._vectors = grown
+    
+    def _upsert_memory(self, doc_id: str, book: dict, vector: np.ndarray) -> None:
+        row = self._rows.get(doc_id)
+        if row is None:
+            self._reserve(len(self.ids) + 1)
+            row = len(self.ids)
+            self.ids.append(doc_id)
+            self._rows[doc_id] = row
+        self._vectors[row] = vector
+        self.books[doc_id] = book
+    
+    def _delete_memory(self, doc_id: str) -> None:
+        """삭제는 마지막 행을 빈 자리로 옮깁니다."""
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self._vectors[row] = self._vectors[last]
+            self.ids[row] = moved_id
+            self._rows[moved_id] = row
+        self.ids.pop()
+        self.books.pop(doc_id, None)
+    
+    def _clear_memory(self) -> None:
+        self.ids = []
+        self.books = {}
+        self._rows = {}
+    
+    # ── 추가 / 삭제 ──
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def add_many(self, items: list[tuple[dict, list[float]]]) -> None:
+        """(embedding을 제외한 도서 source, 벡터) 목록을 추가합니다. 같은 ID는 덮어씁니다."""
+        if not items:
+            return
+        self._write(
+            [
+                (
+                    "INSERT OR REPLACE INTO vectors (id, book, vector) VALUES (?, ?, ?)",
+                    [
+                        (
+                            book["id"],
+                            json.dumps(book, ensure_ascii=False, default=str),
+                            np.asarray(vector, dtype=self.dtype).tobytes(),
+                        )
+                        for book, vector in items
+                    ],
+                ),
+                (
+                    "INSERT INTO changes (id, op) VALUES (?, 'upsert')",
+                    [(book["id"],) for book, _ in items],
+                ),
+            ]
+        )
+    
+    def add(self, book: dict, vector: list[float]) -> None:
+        self.add_many([(book, vector)])
+    
+    def delete(self, doc_id: str) -> bool:
+        if doc_id not in self._rows:
+            return False
+        self._write(
+            [
+                ("DELETE FROM vectors WHERE id = ?", [(doc_id,)]),
+                ("INSERT INTO changes (id, op) VALUES (?, 'delete')", [(doc_id,)]),
+            ]
+        )
+        return True
+    
+    def clear(self) -> None:
+        self._write(
+            [
+                ("DELETE FROM vectors", [()]),
+                ("INSERT INTO changes (id, op) VALUES ('', 'clear')", [()]),
+            ]
+        )
+    
+    def close(self) -> None:
+        self._db.close()
+        self._watch.close()
+    
+    def get_vector(self, doc_id: str) -> list[float] | None:
+        with self._lock:
+            row = self._rows.get(doc_id)
+            if row is None:
+                return None
+            return self._vectors[row].astype(np.float32).tolist()
+    
+    # ── 검색 ──
+    
+    def search(
+        self,
+        query_vector: list[float],
+        top_k: int = 5,
+        exclude_id: str | None = None,
+        filters: RecommendationFilter | None = None,
+    ) -> list[tuple[str, float]]:
+        """정규화된 벡터의 내적으로 코사인 유사도 top-k를 구합니다."""
+        with self._lock:
+            return self._search(query_vector, top_k, exclude_id, filters)
+    
+    def _search(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        exclude_id: str | None,
+        filters: RecommendationFilter | None,
+    ) -> list[tuple[str, float]]:
+        count = len(self.ids)
+        if count == 0:
+            return []
+        
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = self._vectors[:count] @ query.astype(self.dtype)
+        scores = scores.astype(np.float32)
+        
+        if exclude_id is not None and (row := self._rows.get(exclude_id)) is not None:
+            scores[row] = -np.inf
+        if filters is not None and not filters.is_empty():
+            scores[~self._filter_mask(filters)] = -np.inf
+        
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        # ES cosine 점수와 같은 스케일: (1 + cos) / 2
+        return [
+            (self.ids[row], float((1 + scores[row]) / 2))
+            for row in top
+            if np.isfinite(scores[row])
+        ]
+    
+    def _filter_mask(self, filters: RecommendationFilter) -> np.ndarray:
+        """필터 조건을 만족하는 행 마스크 (ES kNN filter와 같은 의미)"""
+        tags = set(filters.tags)
+        created_from = _as_utc(filters.created_from) if filters.created_from else None
+        created_to = _as_utc(filters.created_to) if filters.created_to else None
+        
+        mask = np.ones(len(self.ids), dtype=bool)
+        for row, doc_id in enumerate(self.ids):
+            book = self.books[doc_id]
+            if tags and not tags.intersection(book.get("tags", [])):
+                mask[row] = False
+            elif filters.min_rating is not None and book["rating"] < filters.min_rating:
+                mask[row] = False
+            elif created_from or created_to:
+                created_at = _as_utc(book["created_at"])
+                if (created_from and created_at < created_from) or (
+                    created_to and created_at > created_to
+                ):
+                    mask[row] = False
+        return mask
+    
+    async def search_similar_by_vector(
+        self,
+        query_vector: list[float],
+        top_k: int = 5,
+        exclude_id: str | None = None,
+        num_candidates: int | None = None,
+        filters: RecommendationFilter | None = None,
+    ) -> list[RecommendationResponse]:
+        """ElasticsearchService.search_similar_by_vector와 같은 인터페이스 (num_candidates는 무시)"""
+        await self.catch_up()
+        results = self.search(query_vector, top_k, exclude_id, filters)
+        with self._lock:
+            # 검색 직후 다른 스레드가 삭제한 도서는 건너뜁니다
+            books = [(self.books.get(doc_id), score) for doc_id, score in results]
+        return [
+            RecommendationResponse(book=BookResponse(**book), score=round(score, 4))
+            for book, score in books
+            if book is not None
+        ]
@@ -0,0 +1,524 @@
+"""
+오프라인 성능 벤치마크
+
+네트워크·GPU 없이 실행할 수 있도록 무작위 초기화한 작은 Qwen3 모델과
+메모리 내 Elasticsearch 대역(index / get / search(knn) / bulk / msearch)을 사용합니다.
+서비스 코드(EmbeddingService, ElasticsearchService, FastAPI 라우트)는 그대로 실행하므로
+토큰화·배칭·풀링·검색 본문 생성·직렬화 경로의 성능 변화를 비교할 수 있습니다.
+
+측정 항목
+- 임베딩 처리량: 단건 순차 / encode_batch 배치 / 동시 단건 요청(마이크로 배칭)
+- 색인 속도: index_book 순차 / index_books_bulk
+- 엔드포인트 지연: 동시 요청 부하에서 p50 / p99 (httpx ASGITransport, 서버 없이 앱 직접 호출)
+
+    cd backend
+    python -m scripts.benchmark --output benchmark.json
+    python -m scripts.benchmark --books 2000 --requests 500 --concurrency 32
+
+임베딩·이웃 캐시는 끄고 측정합니다. (그 밖의 설정은 .env / 환경 변수를 그대로 따르므로
+EMBEDDING_BATCH_MAX_WAIT_MS 등을 바꿔 가며 결과 JSON을 비교할 수 있습니다)
+"""
+import os
+
+# 설정은 첫 import 시점에 고정되므로 앱 모듈보다 먼저 지정합니다
+_TINY_HIDDEN_SIZE = 64
+os.environ["EMBEDDING_DIMENSION"] = str(_TINY_HIDDEN_SIZE)
+os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+os.environ["EMBEDDING_EXECUTOR"] = "thread"
+os.environ["EMBEDDING_WORKER_SOCKET"] = ""
+os.environ["SIMILAR_CACHE_ENABLED"] = "false"
+os.environ["VECTOR_BACKEND"] = "elasticsearch"
+os.environ["ALADIN_API_KEY"] = ""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+import httpx
+import numpy as np
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast, Qwen3Config, Qwen3Model
+from app.core.config import get_settings
+from app.main import app
+from app.schemas.book import BookCreateRequest
+from app.services.elasticsearch import get_es_service
+from app.services.embedding import get_embedding_service
+from app.services.embedding_backends import TorchBackend
+
+settings = get_settings()
+
+_WORDS = (
+    "우주 인간 존재 의미 성장 가족 여운 기억 상실 사랑 전쟁 평화 자아 여행 바다 "
+    "도시 고독 우정 시간 꿈 진실 거짓 용기 두려움 계절 편지 음악 그림 숲 별"
+).split()
+
+
+# ── 작은 모델 ──
+
+def build_tiny_tokenizer() -> PreTrainedTokenizerFast:
+    """바이트 단위 BPE(병합 없음) 토크나이저: UTF-8 바이트 하나가 토큰 하나입니다."""
+    alphabet = sorted(pre_tokenizers.ByteLevel.alphabet())
+    vocab = {char: i for i, char in enumerate(alphabet)}
+    vocab["<|endoftext|>"] = len(vocab)
+    
+    tokenizer = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        eos_token="<|endoftext|>",
+        pad_token="<|endoftext|>",
+        padding_side="left",
+    )
+
+
+class TinyBackend(TorchBackend):
+    """무작위 초기화한 2층 Qwen3 모델 (TorchBackend.forward를 그대로 사용)"""
+    
+    name = "tiny"
+    
+    def __init__(self, vocab_size: int, device: str = "cpu"):
+        self.model_name = "tiny-qwen3"
+        self.device = device
+        config = Qwen3Config(
+            vocab_size=vocab_size,
+            hidden_size=_TINY_HIDDEN_SIZE,
+            intermediate_size=_TINY_HIDDEN_SIZE * 2,
+            num_hidden_layers=2,
+            num_attention_heads=4,
+            num_key_value_heads=2,
+            head_dim=_TINY_HIDDEN_SIZE // 4,
+            max_position_embeddings=settings.embedding_max_length,
+        )
+        self.model = Qwen3Model(config).to(device)
+        self.model.eval()
+
+
+def install_tiny_model() -> None:
+    """임베딩 서비스의 토크나이저·백엔드를 작은 모델로 교체하고 준비 완료로 표시합니다."""
+    service = get_embedding_service()
+    service.tokenizer = build_tiny_tokenizer()
+    service.backend = TinyBackend(len(service.tokenizer), settings.embedding_device)
+    service.ready = True
+
+
+# ── 메모리 내 Elasticsearch ──
+
+class _Response(dict):
+    """elasticsearch-py 응답처럼 dict 접근과 .body를 모두 지원합니다."""
+    
+    @property
+    def body(self) -> dict:
+        return self
+
+
+class _JsonSerializer:
+    def dumps(self, data) -> str:
+        return data if isinstance(data, str) else json.dumps(data, default=str)
+
+
+class _Transport:
+    class serializers:
+        @staticmethod
+        def get_serializer(mimetype: str) -> _JsonSerializer:
+            return _JsonSerializer()
+
+
+class _FakeIndices:
+    def __init__(self, es: "FakeElasticsearch"):
+        self.es = es
+    
+    async def exists(self, index: str) -> bool:
+        return index in self.es.indices_created or index in self.es.aliases
+    
+    async def create(self, index: str, body: dict | None = None) -> _Response:
+        self.es.indices_created.add(index)
+        for alias in (body or {}).get("aliases", {}):
+            self.es.aliases[alias] = index
+        return _Response({"acknowledged": True, "index": index})
+    
+    async def exists_alias(self, name: str) -> bool:
+        return name in self.es.aliases
+    
+    async def get_alias(self, name: str) -> _Response:
+        return _Response({self.es.aliases[name]: {"aliases": {name: {}}}})
+    
+    async def refresh(self, index: str | None = None) -> _Response:
+        return _Response({"_shards": {"failed": 0}})
+
+
+class FakeElasticsearch:
+    """
+    벤치마크용 단일 인덱스 메모리 저장소
+    서비스가 사용하는 호출만 구현하며, kNN은 전체 비교(정확한 코사인)로 계산합니다.
+    async_streaming_bulk 헬퍼가 요구하는 options() / transport.serializers도 흉내 냅니다.
+    """
+    
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+        self.indices_created: set[str] = set()
+        self.aliases: dict[str, str] = {}
+        self.indices = _FakeIndices(self)
+        self.transport = _Transport()
+        self._client_meta = ()
+    
+    def options(self, **kwargs) -> "FakeElasticsearch":
+        return self
+    
+    async def ping(self) -> bool:
+        return True
+    
+    async def close(self) -> None:
+        pass
+    
+    async def index(self, index: str, id: str, document: dict, **kwargs) -> _Response:
+        self.docs[id] = document
+        return _Response({"_id": id, "result": "created"})
+    
+    async def get(
+        self,
+        index: str,
+        id: str,
+        source_excludes: list[str] | None = None,
+        source_includes: list[str] | None = None,
+        **kwargs,
+    ) -> _Response:
+        from elasticsearch import NotFoundError
+        
+        if id not in self.docs:
+            raise NotFoundError(404, "not_found", {"found": False})
+        return _Response(
+            {"_id": id, "_source": self._project(self.docs[id], source_excludes, source_includes)}
+        )
+    
+    async def delete(self, index: str, id: str, **kwargs) -> _Response:
+        self.docs.pop(id, None)
+        return _Response({"_id": id, "result": "deleted"})
+    
+    async def count(self, index: str, **kwargs) -> _Response:
+        return _Response({"count": len(self.docs)})
+    
+    async def bulk(self, operations: list, **kwargs) -> _Response:
+        items = []
+        lines = [json.loads(op) if isinstance(op, (str, bytes)) else op for op in operations]
+        for action, source in zip(lines[::2], lines[1::2]):
+            op_type, meta = next(iter(action.items()))
+            self.docs[meta["_id"]] = source
+            items.append({op_type: {"_id": meta["_id"], "status": 201}})
+        return _Response({"errors": False, "took": 0, "items": items})
+    
+    async def search(self, index: str | None = None, body: dict | None = None, **kwargs) -> _Response:
+        body = {**(body or {}), **kwargs}
+        return _Response(self._search(body))
+    
+    async def msearch(self, searches: list[dict], **kwargs) -> _Response:
+        return _Response({"responses": [self._search(body) for body in searches[1::2]]})
+    
+    # ── 검색 구현 ──
+    
+    def _search(self, body: dict) -> dict:
+        excludes = body.get("_source", {}).get("excludes")
+        if "knn" in body:
+            hits = self._knn(body["knn"], body.get("size", 10))
+        elif "knn" in body.get("query", {}):
+            hits = self._knn(body["query"]["knn"], body.get("size", 10), body.get("rescore"))
+        else:
+            hits = [(doc_id, 1.0) for doc_id in list(self.docs)[: body.get("size", 10)]]
+        return {
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "hits": [
+                    {
+                        "_id": doc_id,
+                        "_score": score,
+                        "_source": self._project(self.docs[doc_id], excludes, None),
+                    }
+                    for doc_id, score in hits
+                ],
+            }
+        }
+    
+    def _knn(self, knn: dict, size: int, rescore: dict | None = None) -> list[tuple[str, float]]:
+        candidates = [
+            doc_id for doc_id, doc in self.docs.items() if self._matches(doc_id, doc, knn.get("filter"))
+        ]
+        if not candidates:
+            return []
+        
+        query = np.asarray(knn["query_vector"], dtype=np.float32)
+        matrix = np.asarray([self.docs[doc_id][knn["field"]] for doc_id in candidates], dtype=np.float32)
+        scores = (1 + self._cosine(matrix, query)) / 2
+        order = np.argsort(-scores)[: max(size, knn.get("k", size))]
+        
+        if rescore is not None:
+            # 2단계 검색: 후보를 전체 벡터(embedding)로 재점수
+            window = order[: rescore["window_size"]]
+            params = rescore["query"]["rescore_query"]["script_score"]["script"]["params"]
+            full = np.asarray([self.docs[candidates[i]]["embedding"] for i in window], dtype=np.float32)
+            rescored = (1 + self._cosine(full, np.asarray(params["query_vector"], dtype=np.float32))) / 2
+            return [
+                (candidates[window[i]], float(rescored[i])) for i in np.argsort(-rescored)[:size]
+            ]
+        return [(candidates[i], float(scores[i])) for i in order[:size]]
+    
+    @staticmethod
+    def _cosine(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        return (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    
+    def _matches(self, doc_id: str, doc: dict, query: dict | None) -> bool:
+        """서비스가 만드는 필터(bool / ids / terms / range)만 평가합니다."""
+        if not query:
+            return True
+        if "bool" in query:
+            clauses = query["bool"]
+            positive = clauses.get("filter", []) + clauses.get("must", [])
+            return all(self._matches(doc_id, doc, c) for c in positive) and not any(
+                self._matches(doc_id, doc, c) for c in clauses.get("must_not", [])
+            )
+        if "ids" in query:
+            return doc_id in query["ids"]["values"]
+        if "terms" in query:
+            field, values = next(iter(query["terms"].items()))
+            value = doc.get(field)
+            return bool(set(value if isinstance(value, list) else [value]) & set(values))
+        if "range" in query:
+            field, bounds = next(iter(query["range"].items()))
+            value = doc.get(field)
+            if value is None:
+                return False
+            value = str(value) if isinstance(value, datetime) else value
+            checks = {
+                "gte": lambda b: value >= b,
+                "gt": lambda b: value > b,
+                "lte": lambda b: value <= b,
+                "lt": lambda b: value < b,
+            }
+            return all(checks[op](bound) for op, bound in bounds.items() if op in checks)
+        return True
+    
+    @staticmethod
+    def _project(source: dict, excludes: list[str] | None, includes: list[str] | None) -> dict:
+        if includes:
+            return {k: v for k, v in source.items() if k in includes}
+        if excludes:
+            return {k: v for k, v in source.items() if k not in excludes}
+        return dict(source)
+
+
+async def install_fake_es() -> FakeElasticsearch:
+    """ES 서비스의 클라이언트를 메모리 내 대역으로 교체하고 연결 상태로 만듭니다."""
+    es_service = get_es_service()
+    await es_service.es.close()
+    es_service.es = FakeElasticsearch()
+    await es_service.check_health()
+    return es_service.es
+
+
+# ── 측정 ──
+
+def make_review(rng: random.Random, min_words: int = 20, max_words: int = 120) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))) + "."
+
+
+def make_book(rng: random.Random, i: int) -> BookCreateRequest:
+    return BookCreateRequest(
+        title=f"벤치마크 도서 {i}",
+        author=f"저자 {i % 50}",
+        review=make_review(rng),
+        rating=round(rng.uniform(1, 5), 1),
+        tags=rng.sample(_WORDS, 3),
+    )
+
+
+def percentiles(samples: list[float]) -> dict:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def _rate(count: int, elapsed: float) -> float:
+    return round(count / elapsed, 2) if elapsed > 0 else 0.0
+
+
+async def bench_embedding(rng: random.Random, count: int, batch_sizes: list[int]) -> dict:
+    service = get_embedding_service()
+    texts = [make_review(rng) for _ in range(count)]
+    # 첫 호출의 초기화 비용을 제외하기 위한 워밍업
+    service.encode_batch(texts[:8])
+    
+    started = time.perf_counter()
+    for text in texts:
+        service.encode_document(text)
+    single = time.perf_counter() - started
+    
+    batched = {}
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        for i in range(0, count, batch_size):
+            service.encode_batch(texts[i : i + batch_size])
+        batched[str(batch_size)] = _rate(count, time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(service.encode_document_async(text) for text in texts))
+    concurrent = time.perf_counter() - started
+    
+    return {
+        "texts": count,
+        "single_texts_per_s": _rate(count, single),
+        "batched_texts_per_s": batched,
+        "concurrent_single_texts_per_s": _rate(count, concurrent),
+    }
+
+
+async def bench_indexing(rng: random.Random, count: int) -> dict:
+    es_service = get_es_service()
+    books = [make_book(rng, i) for i in range(count)]
+    single_count = min(count, 100)
+    
+    started = time.perf_counter()
+    for book in books[:single_count]:
+        await es_service.index_book(book)
+    single = time.perf_counter() - started
+    
+    async def items():
+        for book in books:
+            yield book
+    
+    started = time.perf_counter()
+    result = await es_service.index_books_bulk(items())
+    bulk = time.perf_counter() - started
+    
+    return {
+        "single_books": single_count,
+        "single_books_per_s": _rate(single_count, single),
+        "bulk_books": result.succeeded,
+        "bulk_books_per_s": _rate(result.succeeded, bulk),
+    }
+
+
+async def bench_endpoints(
+    rng: random.Random, book_ids: list[str], requests: int, concurrency: int
+) -> dict:
+    scenarios = {
+        "POST /api/recommendations/by-review": lambda: (
+            "POST",
+            "/api/recommendations/by-review",
+            {"review": make_review(rng, 10, 60), "top_k": 5},
+        ),
+        "POST /api/recommendations/by-book": lambda: (
+            "POST",
+            "/api/recommendations/by-book",
+            {"book_id": rng.choice(book_ids), "top_k": 5},
+        ),
+        "GET /api/books/{book_id}": lambda: ("GET", f"/api/books/{rng.choice(book_ids)}", None),
+    }
+    
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, make_request in scenarios.items():
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies: list[float] = []
+            errors = 0
+            
+            async def call() -> None:
+                nonlocal errors
+                method, url, payload = make_request()
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.request(method, url, json=payload)
+                    latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+            
+            started = time.perf_counter()
+            await asyncio.gather(*(call() for _ in range(requests)))
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "requests": requests,
+                "concurrency": concurrency,
+                "errors": errors,
+                "requests_per_s": _rate(requests, elapsed),
+                **percentiles(latencies),
+            }
+            print(f"  {name}: {results[name]}")
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    torch.manual_seed(args.seed)
+    torch.set_num_threads(args.threads)
+    
+    install_tiny_model()
+    fake_es = await install_fake_es()
+    
+    print("⏱️ Embedding throughput")
+    embedding = await bench_embedding(rng, args.texts, args.batch_sizes)
+    print(f"  {embedding}")
+    
+    print("⏱️ Indexing rate")
+    indexing = await bench_indexing(rng, args.books)
+    print(f"  {indexing}")
+    
+    print("⏱️ Endpoint latency")
+    endpoints = await bench_endpoints(rng, list(fake_es.docs), args.requests, args.concurrency)
+    
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "threads": args.threads,
+            "seed": args.seed,
+            "model": f"tiny-qwen3 (hidden={_TINY_HIDDEN_SIZE}, layers=2, random init)",
+            "settings": {
+                "embedding_backend": settings.embedding_backend,
+                "embedding_max_workers": settings.embedding_max_workers,
+                "embedding_batching_enabled": settings.embedding_batching_enabled,
+                "embedding_batch_max_size": settings.embedding_batch_max_size,
+                "embedding_batch_max_wait_ms": settings.embedding_batch_max_wait_ms,
+                "embedding_batch_max_tokens": settings.embedding_batch_max_tokens,
+                "bulk_embedding_chunk_size": settings.bulk_embedding_chunk_size,
+                "es_two_stage": settings.es_two_stage,
+            },
+        },
+        "embedding": embedding,
+        "indexing": indexing,
+        "endpoints": endpoints,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="네트워크·GPU 없이 실행하는 성능 벤치마크")
+    parser.add_argument("--texts", type=int, default=256, help="임베딩 처리량 측정 텍스트 수")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--books", type=int, default=1000, help="색인할 도서 수")
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--threads", type=int, default=max(1, torch.get_num_threads()))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"📝 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
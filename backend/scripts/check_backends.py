@@ -0,0 +1,98 @@
+"""
+임베딩 추론 백엔드 정확도 점검
+
+fp32(torch) 기준 임베딩과 각 백엔드 임베딩의 코사인 유사도, 추론 시간을 비교합니다.
+풀링·MRL·정규화는 서비스와 같은 _pool_and_normalize를 사용합니다.
+
+    cd backend
+    python -m scripts.check_backends --backends torch_int8 bf16 onnx
+"""
+import argparse
+import sys
+import time
+from torch import Tensor
+from transformers import AutoTokenizer
+from app.core.config import get_settings
+from app.services.embedding import REVIEW_TASK, _pool_and_normalize
+from app.services.embedding_backends import BACKENDS, create_backend
+
+settings = get_settings()
+
+SAMPLE_TEXTS = [
+    "데미안 - 헤르만 헤세. 자기 자신을 찾아가는 여정이 인상적이었다. 싱클레어의 내면 성장이 나의 20대와 겹쳐 보였다.",
+    "코스모스 - 칼 세이건. 우주의 광활함 앞에서 인간이 얼마나 작은지, 동시에 얼마나 특별한지 깨닫게 해준 책.",
+    "채식주의자 - 한강. 폭력과 욕망, 그리고 거부에 대한 이야기. 읽는 내내 불편했지만 쉽게 잊히지 않는다.",
+    f"Instruct: {REVIEW_TASK}\nQuery: 우주의 광활함 속에서 인간 존재의 의미를 생각하게 만드는 SF 소설이 읽고 싶다.",
+    f"Instruct: {REVIEW_TASK}\nQuery: 잔잔하지만 오래 여운이 남는 가족 이야기를 찾고 있어요.",
+]
+
+
+def encode(backend, tokenizer, texts: list[str]) -> tuple[Tensor, float]:
+    batch_dict = tokenizer(
+        texts,
+        max_length=settings.embedding_max_length,
+        padding=True,
+        truncation=True,
+        return_tensors="pt",
+        pad_to_multiple_of=8,
+    ).to(settings.embedding_device)
+    
+    started = time.perf_counter()
+    last_hidden_state = backend.forward(batch_dict)
+    elapsed = time.perf_counter() - started
+    
+    embeddings = _pool_and_normalize(
+        last_hidden_state, batch_dict["attention_mask"], settings.embedding_dimension
+    )
+    return embeddings, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="fp32 대비 임베딩 백엔드 정확도 비교")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=[name for name in BACKENDS if name != "torch"],
+        choices=list(BACKENDS),
+    )
+    parser.add_argument(
+        "--min-similarity",
+        type=float,
+        default=0.99,
+        help="이 값보다 낮은 코사인 유사도가 있으면 실패로 처리",
+    )
+    args = parser.parse_args()
+    
+    tokenizer = AutoTokenizer.from_pretrained(settings.embedding_model_name)
+    baseline = create_backend("torch", settings.embedding_model_name, settings.embedding_device)
+    # 첫 호출의 초기화 비용을 제외하기 위한 워밍업
+    encode(baseline, tokenizer, SAMPLE_TEXTS)
+    reference, reference_time = encode(baseline, tokenizer, SAMPLE_TEXTS)
+    print(f"torch (fp32 기준): {reference_time * 1000:.1f}ms")
+    
+    failed = False
+    for name in args.backends:
+        backend = create_backend(
+            name,
+            settings.embedding_model_name,
+            settings.embedding_device,
+            onnx_path=settings.embedding_onnx_path,
+        )
+        encode(backend, tokenizer, SAMPLE_TEXTS)
+        embeddings, elapsed = encode(backend, tokenizer, SAMPLE_TEXTS)
+        
+        # 둘 다 L2 정규화되어 있으므로 내적이 곧 코사인 유사도
+        similarities = (embeddings * reference).sum(dim=1)
+        worst = similarities.min().item()
+        status = "OK" if worst >= args.min_similarity else "FAIL"
+        failed |= status == "FAIL"
+        print(
+            f"{name}: min cos={worst:.5f} mean cos={similarities.mean().item():.5f} "
+            f"| {elapsed * 1000:.1f}ms ({reference_time / elapsed:.2f}x) [{status}]"
+        )
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
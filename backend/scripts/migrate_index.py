@@ -0,0 +1,27 @@
+"""
+인덱스 마이그레이션 (alias 전환)
+
+현재 설정(ES_INDEX_TYPE, ES_HNSW_M 등)으로 새 버전 인덱스를 만들고
+기존 문서를 복사한 뒤 ES_INDEX alias를 원자적으로 전환합니다.
+
+    cd backend
+    python -m scripts.migrate_index [--delete-old]
+"""
+import argparse
+import asyncio
+from app.services.elasticsearch import get_es_service
+
+
+async def main(delete_old: bool) -> None:
+    es = get_es_service()
+    try:
+        await es.migrate_index(delete_old=delete_old)
+    finally:
+        await es.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="현재 설정으로 인덱스를 재구성하고 alias를 전환합니다.")
+    parser.add_argument("--delete-old", action="store_true", help="전환 후 이전 인덱스 삭제")
+    args = parser.parse_args()
+    asyncio.run(main(args.delete_old))
@@ -0,0 +1,39 @@
+"""
+재임베딩·재색인 (alias 전환)
+
+현재 임베딩 설정(EMBEDDING_MODEL_NAME, EMBEDDING_DIMENSION, 긴 텍스트 처리)으로
+전체 도서를 다시 임베딩해 새 버전 인덱스에 기록한 뒤 ES_INDEX alias를 원자적으로 전환합니다.
+내용 해시와 임베딩 버전이 같은 문서는 저장된 벡터를 재사용하고,
+중단되면 다시 실행했을 때 체크포인트(REINDEX_CHECKPOINT_PATH)부터 이어서 진행합니다.
+
+VECTOR_BACKEND=local이면 로컬 벡터 저장소 파일도 새 벡터로 다시 채우므로
+실행 중인 API 서버는 전환 후 재시작해 주세요. (서버에서는 POST /api/admin/reindex 사용)
+
+    cd backend
+    python -m scripts.reindex [--delete-old] [--restart]
+"""
+import argparse
+import asyncio
+from app.services.elasticsearch import get_es_service
+from app.services.embedding import get_embedding_service
+from app.services.reindex import get_reindex_job
+
+
+async def main(delete_old: bool, restart: bool) -> None:
+    es = get_es_service()
+    try:
+        await get_reindex_job().run(delete_old=delete_old, restart=restart)
+    finally:
+        await es.close()
+        get_embedding_service().shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="현재 임베딩 설정으로 전체 도서를 다시 색인하고 alias를 전환합니다.")
+    parser.add_argument("--delete-old", action="store_true", help="전환 후 이전 인덱스 삭제")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 버리고 처음부터 다시 시작")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.delete_old, args.restart))
+    except KeyboardInterrupt:
+        print("⏸️ Reindex interrupted — run again to resume from the checkpoint")
@@ -0,0 +1,104 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.services.elasticsearch import ElasticsearchService
+
+
+class _SortingElasticsearch:
+    """목록 조회에 필요한 정렬 + search_after만 흉내 내는 ES 대역 (PIT 호출은 기록)"""
+    
+    def __init__(self, count: int):
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.sources = [
+            {
+                "id": f"book-{i:02d}",
+                "title": f"도서 {i}",
+                "author": "저자",
+                "review": "감상평",
+                "rating": 4.0,
+                "tags": [],
+                # 같은 시각이 섞여 있어야 id 보조 정렬까지 검증됩니다
+                "created_at": (base + timedelta(minutes=i // 2)).isoformat(),
+                "updated_at": base.isoformat(),
+            }
+            for i in range(count)
+        ]
+        self.pit_calls = 0
+    
+    async def open_point_in_time(self, **kwargs):
+        self.pit_calls += 1
+        return {"id": "pit"}
+    
+    async def search(self, sort, size, search_after=None, pit=None, **kwargs):
+        keys = len(sort) + (1 if pit else 0)  # PIT 검색은 _shard_doc 값이 붙습니다
+        if search_after is not None and len(search_after) != keys:
+            raise ValueError("search_after has different length than sort")
+        
+        def sort_values(source: dict) -> list:
+            millis = int(datetime.fromisoformat(source["created_at"]).timestamp() * 1000)
+            return [millis, source["id"]]
+        
+        ordered = sorted(self.sources, key=sort_values, reverse=True)
+        if search_after is not None:
+            ordered = [s for s in ordered if sort_values(s) < list(search_after[:2])]
+        hits = [
+            {"_source": s, "sort": sort_values(s) + ([7] if pit else [])}
+            for s in ordered[:size]
+        ]
+        return {"hits": {"hits": hits}}
+
+
+def _service(count: int) -> tuple[ElasticsearchService, _SortingElasticsearch]:
+    service = ElasticsearchService()
+    fake = _SortingElasticsearch(count)
+    service.es = fake
+    return service, fake
+
+
+def _expected_ids(fake: _SortingElasticsearch) -> list[str]:
+    return [
+        s["id"]
+        for s in sorted(fake.sources, key=lambda s: (s["created_at"], s["id"]), reverse=True)
+    ]
+
+
+def test_pages_follow_cursor_without_pit():
+    service, fake = _service(7)
+    
+    async def collect() -> list[str]:
+        ids, cursor = [], None
+        while True:
+            books, cursor = await service.get_all_books(size=3, cursor=cursor)
+            ids.extend(book.id for book in books)
+            if cursor is None:
+                return ids
+    
+    assert asyncio.run(collect()) == _expected_ids(fake)
+    assert fake.pit_calls == 0
+
+
+def test_legacy_pit_cursor_continues_after_pit_expired():
+    """PIT ID와 _shard_doc 값이 든 이전 커서도 정렬 키만으로 다음 페이지를 이어서 조회합니다."""
+    service, fake = _service(7)
+    first, _ = asyncio.run(service.get_all_books(size=3))
+    
+    last = first[-1]
+    millis = int(last.created_at.timestamp() * 1000)
+    legacy = base64.urlsafe_b64encode(
+        json.dumps({"pit": "expired-pit", "after": [millis, last.id, 42]}).encode()
+    ).decode()
+    
+    second, cursor = asyncio.run(service.get_all_books(size=3, cursor=legacy))
+    assert [book.id for book in second] == _expected_ids(fake)[3:6]
+    assert json.loads(base64.urlsafe_b64decode(cursor))["after"] == [
+        int(second[-1].created_at.timestamp() * 1000),
+        second[-1].id,
+    ]
+
+
+def test_invalid_cursor_is_rejected():
+    service, _ = _service(1)
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_all_books(cursor="not-a-cursor"))
@@ -1,5 +1,9 @@
 import api from "./client";
-import type { AladinSearchResponse, AladinBookItem } from "../types";
+import type {
+  AladinSearchResponse,
+  AladinBookItem,
+  AladinBatchLookupItem,
+} from "../types";
 
 export const aladinApi = {
   /** 도서 검색 */
@@ -14,6 +18,12 @@ export const aladinApi = {
   loopup: (isbn: string) =>
     api.get<AladinBookItem>(`/aladin/lookup/${isbn}`).then((r) => r.data),
 
+  /** ISBN 일괄 조회 (입력 순서대로 항목별 결과) */
+  lookupBatch: (isbns: string[]) =>
+    api
+      .post<AladinBatchLookupItem[]>("/aladin/lookup/batch", { isbns })
+      .then((r) => r.data),
+
   /** 베스트셀러 */
   bestsellers: (maxResults = 10) =>
     api
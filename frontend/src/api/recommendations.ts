@@ -1,5 +1,5 @@
 import api from "./client";
-import type { Recommendation } from "../types";
+import type { Recommendation, RecommendationGroup } from "../types";
 
 export const recommendApi = {
   /** 감상평 기반 추천 */
@@ -19,4 +19,13 @@ export const recommendApi = {
         top_k: topK,
       })
       .then((r) => r.data),
+
+  /** 여러 감상평 일괄 추천 */
+  batch: (reviews: string[], topK = 5) =>
+    api
+      .post<RecommendationGroup[]>("/recommendations/batch", {
+        reviews,
+        top_k: topK,
+      })
+      .then((r) => r.data),
 };
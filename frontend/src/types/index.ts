@@ -25,6 +25,11 @@ export interface Recommendation {
   score: number;
 }
 
+export interface RecommendationGroup {
+  review: string;
+  recommendations: Recommendation[];
+}
+
 /* ── 알라딘 ── */
 export interface AladinBookItem {
   title: string;
@@ -47,3 +52,9 @@ export interface AladinSearchResponse {
   itemsPerPage: number;
   items: AladinBookItem[];
 }
+
+export interface AladinBatchLookupItem {
+  isbn: string;
+  book: AladinBookItem | null;
+  error: string | null;
+}